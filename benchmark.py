@@ -0,0 +1,340 @@
+##
+#  Benchmarks for the Chore Chart application.
+#
+#  Run with: python benchmark.py [number of lines ...]
+#
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import text_storage_module
+from household_registry_module import HouseholdRegistry, LazyHouseholdRegistry
+from text_storage_module import TextFileStorage
+from household_module import Household
+from chores_list_module import Chore
+from leaderboard_module import score_households, score_household, top_housemates, leaderboard_entries, Leaderboard
+from limits_module import apply_limits, current_limits, load_limits
+from binary_storage_module import BinaryHouseholdFile, write_binary
+from compliance_module import compliance_report
+
+# The default numbers of lines to time the loaders with
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+
+# Creates a valid household name from a number.
+#  @param number, a whole number
+#  @return a string containing only letters which is unique for the number
+#
+def household_name(number):
+    letters = ""
+    for i in range(6):
+        letters += chr(ord("a") + number % 26)
+        number = number // 26
+    return "Bh" + letters
+
+
+# Writes a households file containing a number of valid households.
+#  @param file_name, the name of the file including file extension
+#  @param number_of_lines, the number of households to write
+#
+def write_households_file(file_name, number_of_lines):
+    with open(file_name, "w") as file:
+        for number in range(number_of_lines):
+            file.write("{},4,Anna,Bill,Cleo,Dave,2,washup,3,cook,2\n".format(household_name(number)))
+
+
+# Writes a chore log file containing a number of lines for a single household.
+#  @param file_name, the name of the file including file extension
+#  @param number_of_lines, the number of chore log lines to write
+#
+def write_chore_log_file(file_name, number_of_lines):
+    names = ["Anna", "Bill", "Cleo", "Dave"]
+    with open(file_name, "w") as file:
+        for number in range(number_of_lines):
+            file.write("{},{},washup,1,cook,1\n".format(household_name(0), names[number % 4]))
+
+
+# Runs a function with its printed output hidden and returns how long it took.
+#  @param function, the function to time
+#  @param args, the arguments to pass to the function
+#  @return the time taken in seconds
+#
+def time_quietly(function, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        function(*args)
+        return time.perf_counter() - start
+
+
+# Prints a row of the results table.
+#  @param name, what was timed
+#  @param number_of_lines, the number of lines in the file
+#  @param seconds, the time taken
+#  @param unit, what was counted
+#
+def print_result(name, number_of_lines, seconds, unit="line"):
+    print("\t{:<18}{:>10} {:<10}{:>10.3f} s{:>10.2f} us/{}"
+          .format(name, number_of_lines, unit + "s", seconds, seconds * 1000000 / number_of_lines, unit))
+
+
+# Times read_households and read_chore_log for each size. If the loaders are
+# linear the time per line stays about the same as the files grow.
+#  @param sizes, a list of the numbers of lines to time
+#
+def benchmark_loaders(sizes):
+    print("\nLoad time for the households and chore log files:\n")
+    with tempfile.TemporaryDirectory() as directory:
+        households_file = os.path.join(directory, "households.txt")
+        chore_log_file = os.path.join(directory, "chore_log.txt")
+        for size in sizes:
+            write_households_file(households_file, size)
+            seconds = time_quietly(text_storage_module.read_households, HouseholdRegistry(), households_file)
+            print_result("read_households", size, seconds)
+            seconds = time_quietly(text_storage_module.read_households_parallel, HouseholdRegistry(),
+                                   households_file)
+            print_result("  in parallel", size, seconds)
+        for size in sizes:
+            all_households = HouseholdRegistry()
+            write_households_file(households_file, 1)
+            write_chore_log_file(chore_log_file, size)
+            time_quietly(text_storage_module.read_households, all_households, households_file)
+            seconds = time_quietly(text_storage_module.read_chore_log, all_households, chore_log_file)
+            print_result("read_chore_log", size, seconds)
+
+
+# Times saving the households file after one household has changed, against
+# writing the whole file. Saving only the changed household should take about
+# the same time whatever the size of the file.
+#  @param sizes, a list of the numbers of households to time
+#
+def benchmark_save(sizes):
+    print("\nSave time for the households file with one changed household:\n")
+    with tempfile.TemporaryDirectory() as directory:
+        households_file = os.path.join(directory, "households.txt")
+        for size in sizes:
+            write_households_file(households_file, size)
+            all_households = HouseholdRegistry()
+            storage = TextFileStorage(households_file, os.path.join(directory, "chore_log.txt"),
+                                      os.path.join(directory, "chore_journal.txt"))
+            time_quietly(storage.load, all_households)
+            all_households.get(household_name(size // 2)).update_log("Anna", "cook", 1)
+            seconds = time_quietly(storage.save, all_households)
+            print_result("save", size, seconds)
+            seconds = time_quietly(text_storage_module.write_households, all_households, households_file)
+            print_result("write_households", size, seconds)
+            storage.close()
+
+
+# Creates a registry of households with some chores logged.
+#  @param number_of_households, the number of households to create
+#  @return a HouseholdRegistry
+#
+def make_households(number_of_households):
+    names = ["Anna", "Bill", "Cleo", "Dave"]
+    all_households = HouseholdRegistry()
+    for number in range(number_of_households):
+        household = Household(household_name(number), set(names), {Chore("washup", 3), Chore("cook", 2)})
+        household.update_log(names[number % 4], "cook", number % 7 + 1)
+        household.update_log(names[(number + 1) % 4], "washup", number % 5 + 1)
+        all_households.add(household)
+    return all_households
+
+
+# Times the global top housemates board and the full ranking of every household.
+#  @param sizes, a list of the numbers of households to time
+#
+def benchmark_leaderboard(sizes):
+    print("\nLeaderboard time over all households:\n")
+    for size in sizes:
+        all_households = make_households(size)
+        seconds = time_quietly(top_housemates, all_households, 10)
+        print_result("top_housemates", size, seconds, "household")
+        seconds = time_quietly(score_households, all_households)
+        print_result("score_households", size, seconds, "household")
+
+
+# Times showing one household from the binary file, which only decodes that household,
+# against reading the whole households text file to find it.
+#  @param sizes, a list of the numbers of households to time
+#
+def benchmark_binary(sizes):
+    print("\nTime to read one household from the text and binary files:\n")
+    with tempfile.TemporaryDirectory() as directory:
+        households_file = os.path.join(directory, "households.txt")
+        binary_file = os.path.join(directory, "chore_chart.bin")
+        for size in sizes:
+            write_households_file(households_file, size)
+            all_households = HouseholdRegistry()
+            time_quietly(text_storage_module.read_households, all_households, households_file)
+            write_binary(all_households, binary_file)
+            seconds = time_quietly(text_storage_module.read_households, HouseholdRegistry(), households_file)
+            print_result("text", size, seconds, "household")
+            start = time.perf_counter()
+            with BinaryHouseholdFile(binary_file) as binary:
+                binary.get_household(household_name(size // 2))
+            # The time is for the one household, however many are in the file
+            print_result("binary lookup", 1, time.perf_counter() - start, "lookup")
+
+
+# Creates households with the checking constructor and with from_validated, which
+# is what the loaders use for lines they have already checked.
+#  @param sizes, a list of the numbers of households to time
+#
+def benchmark_construction(sizes):
+    print("\nTime to create households from values which have already been checked:\n")
+    names = {"Anna", "Bill", "Cleo", "Dave"}
+    for size in sizes:
+        start = time.perf_counter()
+        for number in range(size):
+            Household(household_name(number), set(names), {Chore("washup", "3"), Chore("cook", "2")})
+        print_result("Household", size, time.perf_counter() - start, "household")
+        start = time.perf_counter()
+        for number in range(size):
+            Household.from_validated(household_name(number), set(names),
+                                     {Chore.from_validated("washup", "3"), Chore.from_validated("cook", "2")})
+        print_result("from_validated", size, time.perf_counter() - start, "household")
+
+
+# Times the work done with a large household under the "large" limits profile: creating
+# it, logging every chore of every participant, showing it and its leaderboard, selecting
+# participants and chores by number, and reading a households file of such households.
+#  @param number_of_participants, the number of participants in the household
+#  @param number_of_chores, the number of chores in the household
+#  @param number_of_households, the number of households in the households file
+#
+def benchmark_large_household(number_of_participants=500, number_of_chores=50, number_of_households=100):
+    print("\nA household of {} participants and {} chores with the large limits:\n"
+          .format(number_of_participants, number_of_chores))
+    standard = current_limits()
+    apply_limits(load_limits("large"))
+    try:
+        names = [household_name(number)[2:] for number in range(number_of_participants)]
+        chores = [Chore("chore" + household_name(number)[2:], number % 7 + 1) for number in range(number_of_chores)]
+        start = time.perf_counter()
+        household = Household("Hall", set(names), set(chores))
+        print_result("Household", 1, time.perf_counter() - start, "household")
+        leaderboard = Leaderboard()
+        leaderboard.add_household(household)
+        household.listeners = [leaderboard]
+        start = time.perf_counter()
+        for name in names:
+            for chore in chores:
+                household.update_log(name, chore.chore_name, 1)
+        print_result("update_log", number_of_participants * number_of_chores, time.perf_counter() - start, "update")
+        for label in ("str", "  again"):
+            start = time.perf_counter()
+            str(household)
+            print_result(label, 1, time.perf_counter() - start, "view")
+        for label in ("leaderboard", "  again"):
+            start = time.perf_counter()
+            leaderboard_entries(household)
+            print_result(label, 1, time.perf_counter() - start, "view")
+        start = time.perf_counter()
+        for number in range(1, number_of_participants + 1):
+            household.participants.participant_at(number)
+            household.chores.chore_at(number % number_of_chores + 1)
+        print_result("select by number", number_of_participants, time.perf_counter() - start, "selection")
+        with tempfile.TemporaryDirectory() as directory:
+            households_file = os.path.join(directory, "households.txt")
+            line = ",".join(text_storage_module.household_line(household)[1:])
+            with open(households_file, "w") as file:
+                for number in range(number_of_households):
+                    file.write("{},{}\n".format(household_name(number), line))
+            seconds = time_quietly(text_storage_module.read_households, HouseholdRegistry(), households_file)
+            print_result("read_households", number_of_households, seconds, "household")
+    finally:
+        apply_limits(standard)
+
+
+# Measures the memory used by the households read from a households file, which
+# is the memory still allocated once read_households has returned.
+#  @param sizes, a list of the numbers of households to measure
+#
+def benchmark_memory(sizes):
+    print("\nMemory used by the households read from the households file:\n")
+    with tempfile.TemporaryDirectory() as directory:
+        households_file = os.path.join(directory, "households.txt")
+        for size in sizes:
+            write_households_file(households_file, size)
+            all_households = HouseholdRegistry()
+            tracemalloc.start()
+            time_quietly(text_storage_module.read_households, all_households, households_file)
+            used = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            print("\t{:<18}{:>10} {:<10}{:>10.1f} MB{:>10.0f} B/household"
+                  .format("read_households", size, "households", used / 1000000, used / size))
+            del all_households
+
+
+# Times how long the program takes to load the storage and show the menu, reading every
+# household against only finding where each household is and then reading the one viewed.
+#  @param sizes, a list of the numbers of households to time
+#
+def benchmark_time_to_menu(sizes):
+    print("\nTime to load the storage and view one household:\n")
+    with tempfile.TemporaryDirectory() as directory:
+        households_file = os.path.join(directory, "households.txt")
+        chore_log_file = os.path.join(directory, "chore_log.txt")
+        journal_file = os.path.join(directory, "chore_journal.txt")
+        for size in sizes:
+            write_households_file(households_file, size)
+            write_chore_log_file(chore_log_file, 0)
+            for name, all_households in (("full load", HouseholdRegistry()), ("lazy load", LazyHouseholdRegistry())):
+                storage = TextFileStorage(households_file, chore_log_file, journal_file)
+                seconds = time_quietly(storage.load, all_households)
+                seconds = seconds + time_quietly(all_households.get, household_name(size // 2))
+                storage.close()
+                print_result(name, size, seconds, "household")
+
+
+# Times a household's leaderboard for the last 4 weeks after chores have been logged over
+# the weeks kept. The time depends on the number of weeks and not on the chores logged.
+#  @param sizes, a list of the numbers of chores logged to time
+#
+def benchmark_history(sizes):
+    print("\nTime for a household's leaderboard of the last 4 weeks:\n")
+    names = ["Anna", "Bill", "Cleo", "Dave"]
+    now = time.time()
+    for size in sizes:
+        household = Household("House", set(names), {Chore("washup", 3), Chore("cook", 2)})
+        for number in range(size):
+            household.update_log(names[number % 4], "cook", 1, now - (number % 52) * 7 * 24 * 60 * 60)
+        start = time.perf_counter()
+        score_household(household, weeks=4)
+        print_result("4 week scores", size, time.perf_counter() - start, "update")
+
+
+# Times the report of which households are behind with their chores this week.
+#  @param sizes, a list of the numbers of households to time
+#
+def benchmark_compliance(sizes):
+    print("\nCompliance report over all households:\n")
+    for size in sizes:
+        all_households = make_households(size)
+        start = time.perf_counter()
+        list(compliance_report(all_households, behind_only=True))
+        print_result("compliance_report", size, time.perf_counter() - start, "household")
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    benchmark_loaders(sizes)
+    benchmark_save(sizes)
+    benchmark_leaderboard(sizes)
+    benchmark_binary(sizes)
+    benchmark_construction(sizes)
+    benchmark_large_household()
+    benchmark_memory(sizes)
+    benchmark_time_to_menu(sizes)
+    benchmark_history(sizes)
+    benchmark_compliance(sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import mmap
+import os
+import struct
+
+from household_module import Household
+from chores_list_module import Chore
+from household_registry_module import HouseholdRegistry
+import text_storage_module
+
+# The binary households file holds every household and its chore log. All numbers are
+# little endian. The file is laid out as:
+#
+# header        : MAGIC, VERSION, the number of households, the journal sequence number,
+#                 and the offsets of the string table and household index
+# households    : a record for each household, starting with the ids of its name, its number
+#                 of participants and its number of chores, then the ids of the participants'
+#                 names, the ids of the chore names, the chore frequencies, and a fixed width
+#                 count for each participant and chore, one participant's row after another.
+#                 From version 2 the record ends with the number of weekly counts, then the
+#                 week number, participant position, chore position and count of each.
+#                 From version 3 the numbers of participants and chores, the frequencies and
+#                 the positions in the weekly counts are 4 bytes instead of 2, as the limits
+#                 can allow more than 65535.
+# string table  : the number of strings, the offset of each string in the string data and
+#                 the offset of the end, then the UTF-8 string data. A name used by many
+#                 households is only stored once.
+# index         : the name id and record offset of each household, sorted by household name
+#
+# The households are found by a binary search of the index, so a household can be read
+# without reading or decoding any other household.
+
+MAGIC = b"CHORECHT"
+VERSION = 3
+# Version 1 files, which have no weekly counts, and version 2 files, which have 2 byte numbers
+# of participants and chores, frequencies and positions, can still be read
+READABLE_VERSIONS = (1, 2, 3)
+
+HEADER = struct.Struct("<8sHIQQQ")
+RECORD_HEADER = struct.Struct("<III")
+INDEX_ENTRY = struct.Struct("<IQ")
+COUNT = struct.Struct("<I")
+WEEK_COUNT = struct.Struct("<IIII")
+# The record header and weekly counts of versions 1 and 2
+SHORT_RECORD_HEADER = struct.Struct("<IHH")
+SHORT_WEEK_COUNT = struct.Struct("<IHHI")
+
+BINARY_FILE = "chore_chart.bin"
+
+
+class BinaryHouseholdFile:
+
+    # Constructor for the BinaryHouseholdFile class. Opens a binary households file read
+    # only with mmap. Only the header is read when the file is opened, and a household is
+    # only decoded when it is asked for.
+    #
+    # @param file_name the name of the binary households file including file extension
+    # @exception ValueError raised if the file is not a binary households file of this version
+    #
+    def __init__(self, file_name=BINARY_FILE):
+        self.file_name = file_name
+        with open(file_name, "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < HEADER.size:
+            self.close()
+            raise ValueError("'{}' is not a binary households file.".format(file_name))
+        magic, version, self._length, self.sequence, strings_offset, self._index_offset = \
+            HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("'{}' is not a binary households file.".format(file_name))
+        if version not in READABLE_VERSIONS:
+            self.close()
+            raise ValueError("'{}' is version {} of the binary format, but only versions {} can be read."
+                             .format(file_name, version, ", ".join(map(str, READABLE_VERSIONS))))
+        self.version = version
+        # The layout of the numbers which are 2 bytes before version 3
+        if version >= 3:
+            self._record_header, self._week_count, self._frequency = RECORD_HEADER, WEEK_COUNT, "I"
+        else:
+            self._record_header, self._week_count, self._frequency = SHORT_RECORD_HEADER, SHORT_WEEK_COUNT, "H"
+        number_of_strings = COUNT.unpack_from(self._data, strings_offset)[0]
+        self._string_offsets = strings_offset + COUNT.size
+        self._string_data = self._string_offsets + COUNT.size * (number_of_strings + 1)
+
+    def __len__(self):
+        return self._length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    # Close the file.
+    #
+    def close(self):
+        self._data.close()
+
+    # Return a string from the string table.
+    #
+    # @param string_id the id of the string
+    # @return the string
+    #
+    def string(self, string_id):
+        start, end = struct.unpack_from("<II", self._data, self._string_offsets + COUNT.size * string_id)
+        return self._data[self._string_data + start:self._string_data + end].decode("utf-8")
+
+    # Return the household names in name order, decoding only the names.
+    #
+    # @return a generator of household names
+    #
+    def household_names(self):
+        for position in range(self._length):
+            yield self.string(INDEX_ENTRY.unpack_from(self._data, self._index_offset + INDEX_ENTRY.size * position)[0])
+
+    # Return the household with the given name, including its chore log, decoding only
+    # that household's record.
+    #
+    # @param household_name the name of the household
+    # @return the Household object, or None if it does not exist.
+    #
+    def get_household(self, household_name):
+        low, high = 0, self._length
+        while low < high:
+            middle = (low + high) // 2
+            name_id, offset = INDEX_ENTRY.unpack_from(self._data, self._index_offset + INDEX_ENTRY.size * middle)
+            name = self.string(name_id)
+            if name == household_name:
+                return self.read_household(offset)
+            if name < household_name:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    # Decode the household record at an offset.
+    #
+    # @param offset the offset of the record in the file
+    # @return the Household object
+    #
+    def read_household(self, offset):
+        name_id, number_of_participants, number_of_chores = self._record_header.unpack_from(self._data, offset)
+        offset = offset + self._record_header.size
+        fields_format = "<{}I{}I{}{}".format(number_of_participants, number_of_chores, number_of_chores,
+                                             self._frequency)
+        fields = struct.unpack_from(fields_format, self._data, offset)
+        offset = offset + struct.calcsize(fields_format)
+        participants = [self.string(string_id) for string_id in fields[:number_of_participants]]
+        chore_ids = fields[number_of_participants:number_of_participants + number_of_chores]
+        frequencies = fields[number_of_participants + number_of_chores:]
+        # The households were validated before they were written
+        household = Household.from_validated(self.string(name_id), participants,
+                                             [Chore.from_validated(self.string(chore_id), frequency)
+                                              for chore_id, frequency in zip(chore_ids, frequencies)])
+        household.chore_log.set_counts(struct.unpack_from("<{}I".format(number_of_participants * number_of_chores),
+                                                          self._data, offset))
+        if self.version >= 2:
+            offset = offset + COUNT.size * number_of_participants * number_of_chores
+            number_of_weeks = COUNT.unpack_from(self._data, offset)[0]
+            offset = offset + COUNT.size
+            for week, row, column, count in self._week_count.iter_unpack(
+                    self._data[offset:offset + self._week_count.size * number_of_weeks]):
+                household.history.add(participants[row], self.string(chore_ids[column]), count, week)
+        return household
+
+    # Read every household into a registry.
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    #
+    def read_households(self, all_households):
+        for position in range(self._length):
+            offset = INDEX_ENTRY.unpack_from(self._data, self._index_offset + INDEX_ENTRY.size * position)[1]
+            all_households.add(self.read_household(offset))
+
+
+# Write every household and its chore log to a binary households file. The file is
+# written to a temporary file which then replaces it, the same as the text files.
+#
+# @param all_households a HouseholdRegistry of household objects
+# @param file_name the name of the binary households file including file extension
+# @param sequence the sequence number of the last journal update included in the chore logs
+#
+def write_binary(all_households, file_name=BINARY_FILE, sequence=0):
+    string_ids = {}
+
+    def string_id(string):
+        if string not in string_ids:
+            string_ids[string] = len(string_ids)
+        return string_ids[string]
+
+    temporary_file_name = file_name + ".tmp"
+    with open(temporary_file_name, "wb") as file:
+        file.write(bytes(HEADER.size))
+        index = []
+        for household in all_households:
+            index.append((household.household_name, string_id(household.household_name), file.tell()))
+            participants = list(household.chore_log)
+            chores = household.chores.chores
+            log = household.chore_log
+            file.write(RECORD_HEADER.pack(string_id(household.household_name), len(participants), len(chores)))
+            file.write(struct.pack("<{}I{}I{}I".format(len(participants), len(chores), len(chores)),
+                                   *([string_id(name) for name in participants] +
+                                     [string_id(chore.chore_name) for chore in chores] +
+                                     [int(chore.frequency) for chore in chores])))
+            file.write(struct.pack("<{}I".format(len(participants) * len(chores)),
+                                   *[log[name][chore.chore_name] for name in participants for chore in chores]))
+            rows = {name: row for row, name in enumerate(participants)}
+            columns = {chore.chore_name: column for column, chore in enumerate(chores)}
+            weeks = household.history.records()
+            file.write(COUNT.pack(len(weeks)))
+            file.write(b"".join(WEEK_COUNT.pack(week, rows[name], columns[chore], count)
+                                for week, name, chore, count in weeks))
+        strings_offset = file.tell()
+        encoded = [string.encode("utf-8") for string in string_ids]
+        ends = [0]
+        for string in encoded:
+            ends.append(ends[-1] + len(string))
+        file.write(COUNT.pack(len(encoded)))
+        file.write(struct.pack("<{}I".format(len(ends)), *ends))
+        file.write(b"".join(encoded))
+        index_offset = file.tell()
+        index.sort()
+        file.write(b"".join(INDEX_ENTRY.pack(name_id, offset) for name, name_id, offset in index))
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, len(index), sequence, strings_offset, index_offset))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_file_name, file_name)
+
+
+# Convert the households and chore log text files, with the chore journal replayed on
+# top, to a binary households file.
+#
+# @param binary_file the name of the binary households file to write
+# @param households_file the name of the households file to read
+# @param chore_log_file the name of the chore log file to read
+# @param journal_file the name of the chore journal file to read
+# @return the number of households written
+#
+def text_to_binary(binary_file=BINARY_FILE, households_file="households.txt", chore_log_file="chore_log.txt",
+                   journal_file=text_storage_module.CHORE_JOURNAL_FILE):
+    all_households = HouseholdRegistry()
+    storage = text_storage_module.TextFileStorage(households_file, chore_log_file, journal_file)
+    storage.load(all_households)
+    write_binary(all_households, binary_file, storage.journal.sequence)
+    storage.close()
+    return len(all_households)
+
+
+# Convert a binary households file to the households and chore log text files. The chore
+# log file records the same journal sequence number as the binary file, so the updates in
+# the journal after it are still replayed.
+#
+# @param binary_file the name of the binary households file to read
+# @param households_file the name of the households file to write
+# @param chore_log_file the name of the chore log file to write
+# @return the number of households written
+#
+def binary_to_text(binary_file=BINARY_FILE, households_file="households.txt", chore_log_file="chore_log.txt"):
+    all_households = HouseholdRegistry()
+    with BinaryHouseholdFile(binary_file) as binary:
+        binary.read_households(all_households)
+        sequence = binary.sequence
+    text_storage_module.write_households(all_households, households_file)
+    text_storage_module.write_chore_log(all_households, sequence, chore_log_file)
+    return len(all_households)
+
+
+# main method
+#
+# Contains some simple tests
+#
+def main():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        binary_file = os.path.join(directory, "chore_chart.bin")
+
+        print("Test 1: Write two households and read one back")
+        try:
+            registry = HouseholdRegistry()
+            registry.add(Household("House", {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)}))
+            registry.add(Household("Flat", {"personA", "personC"}, {Chore("wash up", 3), Chore("empty bin", 2)}))
+            registry.get("House").update_log("personB", "dusting", 7)
+            write_binary(registry, binary_file, 12)
+            with BinaryHouseholdFile(binary_file) as binary:
+                household = binary.get_household("House")
+                print("\n\tVALID: ", len(binary), list(binary.household_names()), binary.sequence,
+                      household.chore_log, binary.get_household("Loft"))
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 2: Convert to the text files and back, keeping the weekly counts")
+        try:
+            import time
+            registry.get("Flat").update_log("personC", "empty bin", 2, time.time() - 14 * 24 * 60 * 60)
+            write_binary(registry, binary_file, 13)
+            households_file = os.path.join(directory, "households.txt")
+            chore_log_file = os.path.join(directory, "chore_log.txt")
+            binary_to_text(binary_file, households_file, chore_log_file)
+            text_to_binary(binary_file, households_file, chore_log_file, os.path.join(directory, "journal.txt"))
+            with BinaryHouseholdFile(binary_file) as binary:
+                print("\n\tVALID: ", binary.version, binary.get_household("Flat").history.records() ==
+                      registry.get("Flat").history.records(), binary.get_household("House").history.records())
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 3: Open a file which is not a binary households file")
+        try:
+            with open(binary_file, "wb") as file:
+                file.write(b"Penguins,3,Asim,Bogdan,Xiang,2,washup,4,cook,5\n")
+            with BinaryHouseholdFile(binary_file) as binary:
+                print("\n\tVALID: ", len(binary))
+        except Exception as err:
+            print("\tERROR: ", err)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,26 @@
 #  Author: Kulvir Sokhal
 #  Date: December 2019
 
-from household_module import Household
+import argparse
+import asyncio
+
+from household_module import Household, week_of
 from chores_list_module import ChoresList, Chore
 from participants_list_module import Participants
+from household_registry_module import HouseholdRegistry, LazyHouseholdRegistry, POLICIES
+from text_storage_module import TextFileStorage
+from sqlite_storage_module import SQLiteStorage
+from leaderboard_module import Leaderboard, leaderboard_entries
+from ingest_module import ingest_file
+from chore_service_module import serve
+from limits_module import PROFILES, apply_limits, load_limits
+from binary_storage_module import BinaryHouseholdFile, binary_to_text, text_to_binary
+from compliance_module import compliance_report, compliance_string
 
 # Constants used for validation
 
 MENU_CHOICES = ['A', 'C', 'V', 'L', 'S', 'Q']
 
-
 # Prints the menu for the application.
 #
 def print_menu():
@@ -40,7 +51,7 @@ def about():
 
 
 #  Creates a new household using the information entered by the user.
-#  @param all_households, a list of household objects
+#  @param all_households, a HouseholdRegistry of household objects
 #
 #
 def create_household(all_households):
@@ -51,13 +62,15 @@ def create_household(all_households):
     # Returns None if does not already exist
     if household_obj is None:
         # Get participants names
-        members_set = get_participants_names()
+        members_list = get_participants_names()
         # Get chores
-        chores_set = get_chores()
-        # Create new household using participants and chores
-        household_obj = Household(new_household_name, members_set, chores_set)
-        # Add created household to list of current households
-        all_households.append(household_obj)
+        chores_list = get_chores()
+        # Create new household using participants and chores, keeping them in the order they were entered
+        household_obj = Household(new_household_name, members_list, chores_list)
+        # The new household has not been saved yet
+        household_obj.dirty = True
+        # Add created household to the registry of current households
+        all_households.add(household_obj)
         # Print out all entered information
         print("\n\tHousehold entered:\n")
         print("\t\tHousehold Name: ", getattr(household_obj, "household_name"))
@@ -70,21 +83,17 @@ def create_household(all_households):
     return 
 
 
-#  Checks whether a household with a given name exists in the list
+#  Checks whether a household with a given name exists in the registry
 #  of households.
 #
-#   @param all_households, a list of household objects
+#   @param all_households, a HouseholdRegistry of household objects
 #   @param household_name, the household name to check
 #   @return the household, object if the household exists and None if it
 #   does not.
 #
 def household_exists(new_household_name, all_households):
-    h_obj = None
-    for household in all_households:
-        if household.household_name == new_household_name:
-            h_obj = household
-    return h_obj
-        
+    return all_households.get(new_household_name)
+
 
 #  Prompts the user for a household name and checks that the name is
 #  reasonable.
@@ -126,14 +135,14 @@ def get_chore_frequency():
     return int(chore_frequency)
 
 
-#  Gets the names for the people in the household and stores them in a set.
+#  Gets the names for the people in the household and stores them in a list.
 #
 #   Invariants: duplicate names are not allowed
 #
-#   @return a set containing the names.
+#   @return a list containing the names, in the order they were entered.
 #
 def get_participants_names():
-    household_names = set()
+    household_names = []
     name = "AAA"    # dummy value so that we can start the while loop
     number_of_people = 1
     while name != "":
@@ -149,9 +158,8 @@ def get_participants_names():
                 name = "AAA"
         # If name is blank, add names to household_names
         else:
-            current_length = len(household_names)
-            household_names.add(name)
-            if current_length < len(household_names):
+            if name not in household_names:
+                household_names.append(name)
                 number_of_people = number_of_people + 1
             else:
                 print(("\n\t\tSorry, you already have "
@@ -197,7 +205,9 @@ def get_person_name(participant_number):
 #
 def get_chores():
 
-    chores_list = set()
+    # The chores are added to a ChoresList as they are entered, so that each new chore
+    # name is checked against its index of names
+    chores_list = ChoresList.from_validated(())
     new_chore = "AAA"    # dummy value so that we can start the while loop
     number_of_chores = 0
 
@@ -207,7 +217,7 @@ def get_chores():
         if new_chore == "":
             try:
                 # Check if the number of chores is valid
-                ChoresList.is_valid_length(chores_list)
+                ChoresList.is_valid_length(chores_list.chores)
             except ValueError as err:
                 print(err)
                 new_chore = "AAA"
@@ -225,7 +235,7 @@ def get_chores():
             except ValueError as err:
                 print(err)
 
-    return chores_list 
+    return list(chores_list.chores)
 
 
 #  Prompts the user for a chore name and validates it.
@@ -287,7 +297,7 @@ def is_blank(any_string):
 
 
 #  View household.
-#   @param all_households, a list of household objects
+#   @param all_households, a HouseholdRegistry of household objects
 #
 def view_household(all_households):
     view = input("\n\tEnter a household to view: ")
@@ -301,7 +311,7 @@ def view_household(all_households):
 
 
 #  Log chores.
-#   @param all_households, a list of household objects
+#   @param all_households, a HouseholdRegistry of household objects
 #
 def log_chores(all_households):
     
@@ -312,31 +322,34 @@ def log_chores(all_households):
         house = household_exists(house_log, all_households)
         if house is None:
             print("That household does not exist.")
-    # Converts the participants and chores sets to lists so they can be referenced using an index
-    participants = list(house.participants.participants)
-    chores = list(house.chores.chores)
+    # The participants and chores are numbered in the same order as they are printed
+    participants = house.participants
+    chores = house.chores
     # Prints the household
     print("\n", house)
     # Gets the number assigned to the relevant participant and that participant's name
     name_number = get_number("participants'", participants)
-    log_name = participants[int(name_number)-1]
+    log_name = participants.participant_at(int(name_number))
     print("\n\tYou are logging {}’s chores. ".format(log_name))
     # Gets the number assigned to the relevant chore and that chore's name
     chore_number = get_number("chores'", chores)
-    log_chore = str(chores[int(chore_number)-1])[:-4]
-    # Gets the current chore log data for the relevant participant and chore
-    current_completed = house.chore_log[log_name][log_chore]
-    print("\n\t{} has done '{}' {} times."
+    log_chore = chores.chore_at(int(chore_number)).chore_name
+    # Gets the number of times the participant has done the chore this week, which is what the maximum limits
+    current_completed = house.week_count(log_name, log_chore)
+    print("\n\t{} has done '{}' {} times this week."
           .format(log_name, log_chore, current_completed))
     number_completed = input("\n\tHow many more times has {} done '{}': "
                              .format(log_name, log_chore))
     # Asks for the number of chores completed and checks that it the input is a number, and that it is between 0 and the maximum number
-    while number_completed.isdigit() is False or (int(number_completed) + int(\
-            current_completed)) > Household.MAXIMUM_CHORES_DONE or int(number_completed) <= 0:
-        print("\n\tThat is not a valid number completed. The total number completed must be between 0 and {}."
-              .format(Household.MAXIMUM_CHORES_DONE))
-        number_completed = input("\n\tHow many more times has {} done '{}': "
-                                 .format(log_name, log_chore))
+    valid = False
+    while not valid:
+        try:
+            Household.is_valid_number_completed(number_completed, current_completed)
+            valid = True
+        except ValueError as err:
+            print("\n\tThat is not a valid number completed.", err)
+            number_completed = input("\n\tHow many more times has {} done '{}': "
+                                     .format(log_name, log_chore))
     # Updates the chore log
     house.update_log(log_name, log_chore, int(number_completed))
     # Gets the new chore log and prints it 
@@ -348,7 +361,7 @@ def log_chores(all_households):
 
 #  Gets a number of an entry in a list.
 #   @param number_type, a string representing what the number represents
-#   @param attr_list, a list of the attribute the number in referencing
+#   @param attr_list, the Participants, ChoresList or list the number is referencing
 #
 def get_number(number_type, attr_list):
     # Asks for the number assigned to the relevant attribute
@@ -361,9 +374,11 @@ def get_number(number_type, attr_list):
 
 
 #  Show the leaderboard for a house.
-#   @param all_households, a list of household objects
+#   @param all_households, a HouseholdRegistry of household objects
+#   @param leaderboard, a Leaderboard of every household, used to show each participant's
+#          place across all households
 #
-def show_leaderboard(all_households):
+def show_leaderboard(all_households, leaderboard=None):
     
     # Asks for a household name and check if it exists
     leader_house = input("\n\tEnter the household name: ")
@@ -372,15 +387,29 @@ def show_leaderboard(all_households):
         print("\n\tThat household does not exist.")
         leader_house = input("\n\tEnter the household name: ")
         house = household_exists(leader_house, all_households)
-    # Gets the chore log for the selected household
-    leaderboard_log = house.chore_log
-    # Prints the leaderboard for the selected household
-    print("\n\tChore Leaderboard for {}: \n".format(leader_house))
-    for person in leaderboard_log:
-        print("\t{}:".format(person))
-        for chore in leaderboard_log[person]:
-                print("\t\t{} ({})"
-                      .format(chore, leaderboard_log[person][chore]))
+    print_leaderboard(house, leaderboard)
+    if leaderboard is None:
+        print("\tPlaces across all households are not shown, as there is no leaderboard of every household "
+              "when the households are read lazily.")
+    return
+
+
+#  Prints the leaderboard for a house.
+#   @param house, a Household object
+#   @param leaderboard, a Leaderboard of every household, used to show each participant's
+#          place across all households, or None
+#
+def print_leaderboard(house, leaderboard=None):
+    # Prints the leaderboard for the selected household, with the most points first
+    # Each chore done earns the chore's frequency in points
+    # The household keeps the text of its leaderboard until its chore log changes
+    print("\n\tChore Leaderboard for {}: \n".format(house.household_name))
+    for entry in leaderboard_entries(house):
+        print(entry.heading)
+        if leaderboard is not None:
+            print("\t\tPlace across all households: {} of {}"
+                  .format(leaderboard.rank_of(house.household_name, entry.score.name), len(leaderboard)))
+        print(entry.chores)
     return
 
 
@@ -398,7 +427,7 @@ def get_option():
 
 
 # Checks if any household exists and returns a boolean
-# @param all_households, a list of household objects
+# @param all_households, a HouseholdRegistry of household objects
 # @return boolean, True if no households, False if any households
 #
 def check_empty_household(all_households):
@@ -411,286 +440,206 @@ def check_empty_household(all_households):
         return False
 
 
-# Reads a file line by line and returns it as a list
-# @param file_name, the name of the file including file extension
-# @return lines, a list containing the content of the file line by line, and split by comma
+# Reads the command line arguments
+# @param arguments, a list of the command line arguments, defaults to the program's arguments
+# @return the parsed arguments
+#
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(description="Keep track of the chores done in a shared house.")
+    parser.add_argument("--storage", choices=["text", "sqlite"], default="text",
+                        help="store the households in text files (default) or an SQLite database")
+    parser.add_argument("--database", default="chore_chart.db",
+                        help="the SQLite database file used with --storage sqlite")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="read the households file with this many processes, with --storage text")
+    parser.add_argument("--binary-file", default="chore_chart.bin",
+                        help="the binary households file used by the convert, view and leaderboard commands")
+    parser.add_argument("--limits", default="standard",
+                        help="the limits households are checked against: one of {}, or a JSON file of limits"
+                             .format(", ".join(PROFILES)))
+    parser.add_argument("--cache-size", type=int, default=None,
+                        help="read each household only when it is first used, keeping at most this many")
+    parser.add_argument("--cache-bytes", type=int, default=None,
+                        help="read each household only when it is first used, keeping at most this much memory")
+    parser.add_argument("--cache-policy", choices=POLICIES, default="lru",
+                        help="let go of the least recently used (default) or least often used households")
+    commands = parser.add_subparsers(dest="command")
+    ingest_parser = commands.add_parser("ingest", help="log the chore events in a CSV or JSON lines file")
+    ingest_parser.add_argument("file", help="a CSV file of household,participant,chore,count lines, "
+                                            "or a .jsonl file of objects with those keys")
+    convert_parser = commands.add_parser("convert", help="convert between the text files and the binary file")
+    convert_parser.add_argument("direction", choices=["to-binary", "to-text"],
+                                help="to-binary reads the text files, to-text writes them")
+    view_parser = commands.add_parser("view", help="show a household from the binary file")
+    view_parser.add_argument("household", help="the name of the household")
+    leaderboard_parser = commands.add_parser("leaderboard", help="show a household's leaderboard from the binary file")
+    leaderboard_parser.add_argument("household", help="the name of the household")
+    compliance_parser = commands.add_parser("compliance",
+                                            help="report which households are keeping up with their chores")
+    compliance_parser.add_argument("--weeks-ago", type=int, default=0,
+                                   help="report on an earlier week, such as 1 for last week")
+    compliance_parser.add_argument("--behind", action="store_true",
+                                   help="only report the households which are behind with a chore")
+    serve_parser = commands.add_parser("serve", help="serve the households as JSON over HTTP")
+    serve_parser.add_argument("--host", default="127.0.0.1",
+                              help="the address to listen on, which defaults to this computer only")
+    serve_parser.add_argument("--port", type=int, default=8080, help="the port to listen on")
+    return parser.parse_args(arguments)
+
+
+# Creates the storage chosen by the command line arguments
+# @param arguments, the parsed command line arguments
+# @return a TextFileStorage or SQLiteStorage object
+#
+def open_storage(arguments):
+    if arguments.storage == "sqlite":
+        return SQLiteStorage(arguments.database)
+    else:
+        return TextFileStorage(workers=arguments.workers)
+
+
+# Creates the registry chosen by the command line arguments
+# With --cache-size or --cache-bytes, only the household names are read when the storage
+# is loaded, and each household is read when it is first used
+# @param arguments, the parsed command line arguments
+# @return a HouseholdRegistry or LazyHouseholdRegistry object
 #
-def read_file(file_name):
-    try:
-        # Creates an empty list to hold all the file from the file
-        lines = []
-        # Open the file and read it line by line
-        with open(file_name) as file:
-            line = file.readline()
-            while line:
-                # Removes the whitespace at the end of, and splits by comma, each line and adds it to the lines list
-                line = line.rstrip()
-                line = line.split(",")
-                lines.append(line)
-                line = file.readline()
-        file.close()
-    except IOError:
-        # Print an error if the file can not be found
-        print("Error: '{}' file can not be found.".format(file_name))
-    return lines
-
-
-# Writes a list to a file line by line
-# @param file_name, the name of the file including file extension
-# @param lines, a list containing the content to be written to the file, line by line
-#
-def write_to_file(file_name, lines):
-    # Creates a list to write to the file
-    output = []
-    # For each line in the lines list, join the elements into a string separated by a comma
-    # Then add the string the output list
-    for line in lines:
-        line = ",".join(line)
-        output.append(line)
-    # Joins all the elements in the output list separated by a new line
-    # This writes all the elements on different lines of the file
-    output = "\n".join(output)
-    # Opens the file, write the list to it, and then closes it
-    # Creates the file if it does not exist
-    file = open(file_name, "w+")
-    file.write(output)
-    file.close()
-
-
-# Reads the households file and sorts the data from it
-# @param all_households, a list of household objects
-#
-def read_households(all_households):
-    # Gets the data from the households file
-    lines = read_file("households.txt")
-    # Creates empty lists of the households' properties
-    all_household_names = []
-    all_participants = []
-    all_chores = []
-    # For each line of the file data, it validates the elements based on the given format
-    for line in lines:
-        # Creates an error message referencing the line to be displayed when there is an error
-        error_msg = "\nError on line {} of the 'households' file (This line will be omitted):\n\t".format(
-            lines.index(line) + 1)
-        # Tries to get the household name and if it can not be found, gives an error and skips the whole line
-        try:
-            household_name = line[0]
-        except (IndexError, ValueError):
-            print(error_msg)
-            print("\tThe first element should be the households name."
-                  .format(lines.index(line) + 1))
-            continue
-        # Tries to get the participants and if it can not be found, gives an error and skips the whole line
-        try:
-            number_of_participants = int(line[1])
-            participants_offset = number_of_participants + 2
-            participants = line[2:participants_offset]
-        except (IndexError, ValueError):
-            print(error_msg)
-            print(
-                "\tThe second element should be the number of participants followed by that number of participants.")
-            continue
-        # Tries to get the chores and if it can not be found, gives an error and skips the whole line
-        try:
-            number_of_chores = int(line[participants_offset])
-            chores_offest = participants_offset + 1
-            chores = line[chores_offest:chores_offest + (2 * number_of_chores)]
-        except (IndexError, ValueError):
-            print(error_msg)
-            print(
-                "\tThe element after the defined number of participants should be the number of chores followed by that number of chores and frequencies.")
-            continue
-        # Checks if the households’ name is valid and adds them to the respective list
-        # If not valid, gives an error and skips the whole line
-        try:
-            Household.is_valid_name(household_name)
-            if household_name in all_household_names:
-                raise ValueError(
-                    "The household name '{}' had already been used and can not be used again."
-                    .format(household_name))
-        except (TypeError, ValueError) as err:
-            print(error_msg, err)
-            continue
-        # Checks if the participants names' and number of participants are valid and adds them to the respective list
-        # If not valid, gives an error and skips the whole line
-        try:
-            Participants.is_valid_length(participants)
-            for name in participants:
-                Participants.is_valid_name(name)
-            particpants_set = set(participants)
-            if len(participants) != len(particpants_set):
-                raise ValueError(
-                    "There are multiple participants with the same.")
-        except (TypeError, ValueError) as err:
-            print(error_msg, err)
-            continue
-        # Checks if the number of chores, chore name, and chore frequency are is valid and adds them to the respective list
-        # If not valid, gives an error and skips the whole line
-        try:
-            chore_names = []
-            for chore in chores:
-                if chore.isdigit():
-                    Chore.is_valid_frequency(chore)
-                else:
-                    Chore.is_valid_chore_name(chore)
-                    chore_names.append(chore)
-            ChoresList.is_valid_length(chore_names)
-            chore_names_set = set(chore_names)
-            if len(chore_names) != len(chore_names_set):
-                raise ValueError("There are multiple chores with the same.")
-        except (TypeError, ValueError) as err:
-            print(error_msg, err)
-            continue
-        all_household_names.append(household_name)
-        all_participants.append(participants)
-        all_chores.append(chores)
-    # Creates objects for all the valid households
-    add_households(all_households, all_household_names, all_participants, all_chores)
-    return
+def open_registry(arguments):
+    if arguments.cache_size or arguments.cache_bytes:
+        return LazyHouseholdRegistry(arguments.cache_size, arguments.cache_bytes, arguments.cache_policy)
+    else:
+        return HouseholdRegistry()
 
 
-# Creates objects for all he valid households from teh file
-#   @param all_households, a list of household objects
-#   @param household_names, a list of all valid household names from file
-#   @param participants, a list of all valid participants from file
-#   @param chores, a list of all valid chores and frequencies from file
-#
-def add_households(all_households, household_names, participants, chores):
-    # For each household from the file, create the relevant objects for the household
-    for household in range(len(household_names)):
-        new_household_name = household_names[household]
-        members_set = set(participants[household])
-        chores_set = set()
-        for i in range(len(chores[household])):
-            if i % 2 == 0:
-                chore_obj = Chore(chores[household][i],
-                                  chores[household][i + 1])
-                chores_set.add(chore_obj)
-        household_obj = Household(new_household_name, members_set, chores_set)
-        all_households.append(household_obj)
-    return
+# Creates the leaderboard across all households, kept up to date as chores are logged
+# The leaderboard needs every household, so there is none when the households are read lazily,
+# which is printed so that it is clear why places across all households are not shown
+# @param all_households, a HouseholdRegistry of household objects
+# @return a Leaderboard object, or None
+#
+def open_leaderboard(all_households):
+    if isinstance(all_households, LazyHouseholdRegistry):
+        print("\n\tThe households are read lazily, so there is no leaderboard of every household. "
+              "Places across all households are not shown.")
+        return None
+    leaderboard = Leaderboard()
+    leaderboard.add_households(all_households)
+    all_households.add_listener(leaderboard)
+    return leaderboard
 
 
-# Formats the household objects for writing to a file
-# @param all_households, a list of household objects
-#
-def write_households(all_households):
-    # Creates an empty list for all the lines to write to the file
-    all_lines = []
-    # For all the household objects, format the data to write to the file
-    for household in all_households:
-        line = []
-        # Gets all the attributes for the household
-        household_name = getattr(household, "household_name")
-        participants = str(getattr(household, "participants"))
-        chores = str(getattr(household, "chores"))
-        # Get the number of participants and chores
-        number_of_people = str(len(participants.split(",")))
-        number_of_chores = str(len(chores.split(",")))
-        # Adds the household name and number of people to the formatted line
-        line.append(household_name)
-        line.append(number_of_people)
-        # Removes whitespaces
-        participants = participants.replace(" ", "")
-        # Adds the participants and number of chores to the formatted line
-        line.append(participants)
-        line.append(number_of_chores)
-        # Removes the brackets and whitespaces
-        chores = chores.replace(" (", ",").replace(")", "").replace(" ", "")
-        # Adds the chores to the formatted line
-        line.append(chores)
-        # Ads the lines to the all_lines list
-        all_lines.append(line)
-    # Write the all_lines list to the households file
-    write_to_file("households.txt", all_lines)
-    return
+# Logs the chore events in a file and saves them, without showing the menu
+# @param storage, the storage to log the chore events in
+# @param file_name, the name of the file of chore events
+# @param all_households, the registry to read the households into
+#
+def ingest(storage, file_name, all_households):
+    storage.load(all_households)
+    ingest_file(all_households, file_name)
+    storage.save(all_households)
+    storage.close()
 
 
-# Reads the chore_log from a file and updates the chore log from it
-# @param all_households, a list of household objects
-#
-def read_chore_log(all_households):
-    # Read all the lines from the chore_log file
-    lines = read_file("chore_log.txt")
-    # Creates a list of all the names of current households
-    valid_households = []
-    for household in all_households:
-        valid_households.append(getattr(household, "household_name"))
-    # For all the lines from the file, validate the data and update the chore log
-    for line in lines:
-        # Creates an error message referencing the line to be displayed when there is an error
-        error_msg = "\nError on line {} of the 'chore_log' file (This line will be omitted):\n\t".format(
-            lines.index(line) + 1)
-        try:
-            # If the first element in the line is a valid household, continue
-            # If not print an error message
-            if line[0] in valid_households:
-                # Gets the attribute for the respective household
-                household_obj_index = valid_households.index(line[0])
-                household_obj = all_households[household_obj_index]
-                participants = str(getattr(household_obj, "participants"))
-                chores = str(getattr(household_obj, "chores"))
-                # If the second element is not a current participant, print an error and skip the line
-                if line[1] not in participants:
-                    raise ValueError(
-                        "The second element should be the name of a current participant.")
-                # For every pair of elements after the second element, check that the two elements are valid
-                for i in range(2, len(line), 2):
-                    # If the first of the pair is not a current chore, print an error and skip the line
-                    if line[i] not in chores:
-                        raise ValueError("The chores should be current chores.")
-                    # If the second of the pair is not a digit, print an error and skip the line
-                    elif line[i + 1].isdigit() is False:
-                        raise ValueError("The number completed should be a digit")
-                    # If the second of the pair larger than the maximum number allowed, an error and skip the line
-                    elif int(line[i + 1]) > Household.MAXIMUM_CHORES_DONE:
-                        raise ValueError("The number completed must be under {}".format(Household.MAXIMUM_CHORES_DONE))
-                    # If all checks are passed, update the household
-                    else:
-                        household_obj.update_log(line[1], line[i], line[i + 1])
-            else:
-                raise ValueError(
-                    "The first element should be the name of a current household.")
-        except ValueError as err:
-            print(error_msg, err)
-        except IndexError:
-            print(error_msg, "The 'chore_log' file is incomplete")
-    return
+# Prints how every household is keeping up with its chores in a week, without showing the menu
+# @param storage, the storage to read the households from
+# @param all_households, the registry to read the households into
+# @param weeks_ago, the number of weeks before this week to report on
+# @param behind_only, True to only print the households which are behind with a chore
+#
+def report_compliance(storage, all_households, weeks_ago=0, behind_only=False):
+    storage.load(all_households)
+    for compliance in compliance_report(all_households, week_of() - weeks_ago, behind_only):
+        print("\n" + compliance_string(compliance))
+    storage.close()
 
 
-# Formats the chore_log attribute for writing to a file
-# @param all_households, a list of household objects
-#
-def write_chore_log(all_households):
-    # Creates an empty list of the lines to be written to a file
-    lines = []
-    # For every household, format the data to be written to the file
-    for household in all_households:
-        # Gets the chore_log for the respective household
-        household_name = getattr(household, "household_name")
-        log = getattr(household, "chore_log")
-        # Creates a sting from the chore_log in the format household name, participant, chore_name, number completed
-        for name in log:
-            file_line = []
-            file_line.append(household_name)
-            file_line.append(name)
-            for chore in log[name]:
-                file_line.append(chore)
-                file_line.append(str(log[name][chore]))
-            lines.append(file_line)
-    # Write all the chore log data to the file
-    write_to_file("chore_log.txt", lines)
-    return
+# Converts the households between the text files and the binary file
+# @param direction, "to-binary" to write the binary file or "to-text" to write the text files
+# @param binary_file, the name of the binary households file
+#
+def convert(direction, binary_file):
+    try:
+        if direction == "to-binary":
+            number = text_to_binary(binary_file)
+        else:
+            number = binary_to_text(binary_file)
+    except (IOError, ValueError) as err:
+        print("Error: '{}' could not be converted:".format(binary_file), err)
+        return
+    print("\n\tConverted {} households {}.".format(number, direction))
+
+
+# Shows a household or its leaderboard from the binary file, reading only that household
+# @param command, "view" or "leaderboard"
+# @param binary_file, the name of the binary households file
+# @param household_name, the name of the household
+#
+def show_from_binary(command, binary_file, household_name):
+    try:
+        with BinaryHouseholdFile(binary_file) as binary:
+            house = binary.get_household(household_name)
+    except (IOError, ValueError) as err:
+        print("Error: '{}' could not be read:".format(binary_file), err)
+        return
+    if house is None:
+        print("\n\tThat household does not exist.")
+    elif command == "view":
+        print("\n", house)
+    else:
+        print_leaderboard(house)
+
+
+# Serves the households over HTTP until the program is interrupted, then saves them
+# @param storage, the storage to read and save the households in
+# @param host, the address to listen on
+# @param port, the port to listen on
+# @param all_households, the registry to read the households into
+#
+def run_service(storage, host, port, all_households):
+    storage.load(all_households)
+    leaderboard = open_leaderboard(all_households)
+    try:
+        asyncio.run(serve(all_households, host, port, leaderboard))
+    except KeyboardInterrupt:
+        pass
+    storage.save(all_households)
+    storage.close()
 
 
 # The menu is displayed until the user quits
 # 
 def main():
-    all_households = []   
     option = '*'
-    # Reads the household and chore log files and adds any valid data
-    read_households(all_households)
-    read_chore_log(all_households)
+    arguments = parse_arguments()
+    all_households = open_registry(arguments)
+    # The limits are applied before any households are read
+    try:
+        apply_limits(load_limits(arguments.limits))
+    except (IOError, ValueError) as err:
+        print("Error: the limits '{}' could not be loaded:".format(arguments.limits), err)
+        return
+    # The binary file commands only read the households they need, without opening the storage
+    if arguments.command == "convert":
+        convert(arguments.direction, arguments.binary_file)
+        return
+    if arguments.command in ("view", "leaderboard"):
+        show_from_binary(arguments.command, arguments.binary_file, arguments.household)
+        return
+    # Reads the households and chore logs from storage and adds any valid data
+    # Every chore logged from now on is recorded in storage as it happens
+    storage = open_storage(arguments)
+    if arguments.command == "ingest":
+        ingest(storage, arguments.file, all_households)
+        return
+    if arguments.command == "compliance":
+        report_compliance(storage, all_households, arguments.weeks_ago, arguments.behind)
+        return
+    if arguments.command == "serve":
+        run_service(storage, arguments.host, arguments.port, all_households)
+        return
+    storage.load(all_households)
+    # The leaderboard across all households is kept up to date as chores are logged
+    leaderboard = open_leaderboard(all_households)
     while option != 'Q':
         option = get_option()        
         if option == 'A':
@@ -708,16 +657,14 @@ def main():
         elif option == 'S':
             # Only continues if household isn’t empty
             if check_empty_household(all_households) is False:
-                show_leaderboard(all_households)
-    # Writes the household and chore log data to the respective files
-    write_households(all_households)
-    write_chore_log(all_households)
+                show_leaderboard(all_households, leaderboard)
+    # Writes the household data to storage
+    # The chore log data has already been written to storage as the chores were logged
+    storage.save(all_households)
+    storage.close()
     print("\n\nBye, bye.")
 
 
 # Start the program
 if __name__ == "__main__":
     main()
-
-
-
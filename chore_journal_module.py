@@ -0,0 +1,158 @@
+import threading
+import time
+
+
+class ChoreJournal:
+    # The number of updates the journal can hold before it is compacted into a snapshot
+    COMPACTION_THRESHOLD = 1000
+
+    # Constructor for the ChoreJournal class. The journal is a text file that has one
+    # line appended to it for every update to a household's chore log, in the format:
+    #
+    # sequence number,household name,participant,chore name,number completed,timestamp
+    #
+    # The chore log file is a snapshot of the chore logs, and the journal holds the
+    # updates made since, so the chore log is the snapshot with the journal replayed on top.
+    # The snapshot records the sequence number of the last update it includes, so that
+    # updates already in the snapshot are not replayed twice.
+    #
+    # @param file_name the name of the journal file including file extension
+    # @param snapshot_writer a function taking a sequence number which writes a snapshot of
+    #        every chore log, or None if the journal should not be compacted
+    #
+    def __init__(self, file_name, snapshot_writer=None):
+        self.file_name = file_name
+        self.snapshot_writer = snapshot_writer
+        self.sequence = 0  # The sequence number of the last update
+        self.events = 0  # The number of updates in the journal file
+        self._file = None
+        # Held while appending, as households updated from different threads share the journal
+        self._lock = threading.RLock()
+
+    # Called by a household whenever its chore log is updated. Appends the update to the journal.
+    #
+    # @param household the Household object that was updated
+    # @param name a string containing the name of the participant
+    # @param chore a string containing the name of the chore
+    # @param number_completed the number added on to the existing total
+    # @param timestamp the time the chores were done in seconds since the epoch
+    #
+    def chore_logged(self, household, name, chore, number_completed, timestamp):
+        self.append(household.household_name, name, chore, number_completed, timestamp)
+
+    # Append an update to the end of the journal. The file is kept open between
+    # updates and flushed after each one so that it is not lost if the program stops.
+    # The journal is compacted once it holds COMPACTION_THRESHOLD updates.
+    # Updates from different threads are appended one at a time.
+    #
+    # @param household_name a string containing the name of the household
+    # @param name a string containing the name of the participant
+    # @param chore a string containing the name of the chore
+    # @param number_completed the number added on to the existing total
+    # @param timestamp the time of the update in seconds since the epoch, defaults to now
+    #
+    def append(self, household_name, name, chore, number_completed, timestamp=None):
+        if timestamp is None:
+            timestamp = int(time.time())
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.file_name, "a")
+            self.sequence = self.sequence + 1
+            self._file.write("{},{},{},{},{},{}\n".format(self.sequence, household_name, name, chore,
+                                                          int(number_completed), timestamp))
+            self._file.flush()
+            self.events = self.events + 1
+            if self.needs_compaction():
+                self.compact()
+
+    # Check whether the journal has grown enough to be compacted.
+    #
+    # @return True if the journal should be compacted, False if not.
+    #
+    def needs_compaction(self):
+        return self.snapshot_writer is not None and self.events >= ChoreJournal.COMPACTION_THRESHOLD
+
+    # Fold the journal into a snapshot and empty it. The snapshot writer must replace
+    # the snapshot atomically, so that if the program stops part way through either the
+    # old snapshot and the whole journal, or the new snapshot, are kept.
+    #
+    def compact(self):
+        self.snapshot_writer(self.sequence)
+        self.close()
+        open(self.file_name, "w").close()
+        self.events = 0
+
+    # Close the journal file. It will be opened again if another update is appended.
+    #
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # Split a line of the journal into its parts.
+    #
+    # @param fields a list of the elements of the line split by comma
+    # @return a tuple of the sequence number, household name, participant, chore,
+    #         number completed and timestamp
+    # @exception IndexError raised if the line does not have enough elements
+    # @exception ValueError raised if the numbers in the line are not whole numbers
+    #
+    @staticmethod
+    def parse_event(fields):
+        if len(fields) != 6:
+            raise IndexError("A journal line should have 6 elements.")
+        sequence, household_name, name, chore, number_completed, timestamp = fields
+        if not sequence.isdigit() or not number_completed.isdigit() or not timestamp.isdigit():
+            raise ValueError("The sequence number, number completed and timestamp should be digits.")
+        return int(sequence), household_name, name, chore, int(number_completed), int(timestamp)
+
+
+# main method
+#
+# Contains some simple tests
+#
+def main():
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal_file = os.path.join(directory, "chore_journal.txt")
+
+        print("Test 1: Append updates and replay them from the journal file")
+        try:
+            journal = ChoreJournal(journal_file)
+            journal.append("House", "personA", "wash up", 2, 1700000000)
+            journal.append("House", "personB", "dusting", 1, 1700000060)
+            journal.close()
+            with open(journal_file) as file:
+                events = [ChoreJournal.parse_event(line.rstrip().split(",")) for line in file]
+            print("\n\tVALID: ", journal.sequence, journal.events, events)
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 2: Compact the journal once it holds COMPACTION_THRESHOLD updates")
+        try:
+            snapshots = []
+            threshold = ChoreJournal.COMPACTION_THRESHOLD
+            ChoreJournal.COMPACTION_THRESHOLD = 3
+            journal_file = os.path.join(directory, "compacted_journal.txt")
+            journal = ChoreJournal(journal_file, snapshots.append)
+            for number in range(4):
+                journal.append("House", "personA", "wash up", 1)
+            journal.close()
+            ChoreJournal.COMPACTION_THRESHOLD = threshold
+            with open(journal_file) as file:
+                print("\n\tVALID: ", snapshots, journal.events, file.read().split(",")[:2])
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 3: Read a line with a number completed which is not a digit")
+        try:
+            print("\n\tVALID: ", ChoreJournal.parse_event(["5", "House", "personA", "wash up", "two", "1700000000"]))
+        except Exception as err:
+            print("\tERROR: ", err)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+import asyncio
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from household_module import Household, ChoreHistory, week_of
+from chores_list_module import Chore
+from household_registry_module import LazyHouseholdRegistry
+from leaderboard_module import leaderboard_entries, top_housemates
+from compliance_module import household_compliance, chores_behind
+
+# The most bytes of JSON accepted in the body of a request
+
+MAXIMUM_BODY_LENGTH = 65536
+
+
+# An error to be sent back to the client instead of the response
+# status : the HTTPStatus of the response
+# message : a string explaining the error
+
+class ServiceError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ChoreService:
+
+    # Constructor for the ChoreService class. The service answers HTTP requests with JSON,
+    # so that many clients can share one registry of households at the same time.
+    #
+    # Every client is served by the same event loop, and a household is checked and changed
+    # without awaiting anything in between, so the writes happen one at a time without a lock.
+    #
+    # The endpoints are:
+    #
+    # GET  /households                      the names of every household
+    # POST /households                      create a household from {"name", "participants", "chores"}
+    # GET  /households/<name>               a household and its chore log
+    # POST /households/<name>/log           log chores from {"participant", "chore", "count"}
+    # GET  /households/<name>/leaderboard   the household's participants, most points first
+    #                                       (?weeks=<number> counts only the last weeks), with each
+    #                                       one's "overall_place" of all time, which is null when
+    #                                       there is no leaderboard of every household
+    #                                       as the households are read lazily
+    # GET  /households/<name>/compliance    the chores done this week against each chore's frequency
+    #                                       (?weeks_ago=<number> for an earlier week)
+    # GET  /leaderboard?top=<number>        the participants with the most points across all households
+    #                                       (&weeks=<number> counts only the last weeks)
+    # GET  /cache                           the household cache's counts, when households are read lazily
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    # @param leaderboard a Leaderboard listening to the registry, or None to work out the
+    #        leaderboard across all households when it is asked for
+    #
+    def __init__(self, all_households, leaderboard=None):
+        self.all_households = all_households
+        self.leaderboard = leaderboard
+
+    # Serve one connection. A single request is read, answered and the connection closed.
+    #
+    # @param reader the asyncio.StreamReader of the connection
+    # @param writer the asyncio.StreamWriter of the connection
+    #
+    async def handle_connection(self, reader, writer):
+        try:
+            try:
+                method, target, body = await read_request(reader)
+                status, result = await self.handle_request(method, target, body)
+            except ServiceError as err:
+                status, result = err.status, {"error": str(err)}
+            writer.write(response_bytes(status, result))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    # Answer a request.
+    #
+    # @param method the HTTP method, such as "GET"
+    # @param target the path and query string of the request
+    # @param body the decoded JSON body, or None if there was no body
+    # @return a tuple of the HTTPStatus and the result to be sent as JSON
+    # @exception ServiceError raised if the request can not be answered
+    #
+    async def handle_request(self, method, target, body):
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        if parts == ["households"]:
+            if method == "GET":
+                return HTTPStatus.OK, self.all_households.household_names()
+            if method == "POST":
+                return HTTPStatus.CREATED, self.create_household(body)
+        elif len(parts) == 2 and parts[0] == "households":
+            if method == "GET":
+                # The household keeps its JSON until it changes
+                return HTTPStatus.OK, self.find_household(parts[1]).rendered("json", household_json)
+        elif len(parts) == 3 and parts[0] == "households" and parts[2] == "log":
+            if method == "POST":
+                return HTTPStatus.OK, self.log_chores(parts[1], body)
+        elif len(parts) == 3 and parts[0] == "households" and parts[2] == "leaderboard":
+            if method == "GET":
+                return HTTPStatus.OK, self.household_leaderboard(parts[1], parse_qs(url.query).get("weeks", [None])[0])
+        elif len(parts) == 3 and parts[0] == "households" and parts[2] == "compliance":
+            if method == "GET":
+                return HTTPStatus.OK, self.household_compliance(parts[1],
+                                                                parse_qs(url.query).get("weeks_ago", ["0"])[0])
+        elif parts == ["leaderboard"]:
+            if method == "GET":
+                query = parse_qs(url.query)
+                return HTTPStatus.OK, self.top(query.get("top", ["10"])[0], query.get("weeks", [None])[0])
+        elif parts == ["cache"]:
+            if method == "GET":
+                if not isinstance(self.all_households, LazyHouseholdRegistry):
+                    raise ServiceError(HTTPStatus.NOT_FOUND, "The households are not read lazily.")
+                return HTTPStatus.OK, self.all_households.stats()._asdict()
+        else:
+            raise ServiceError(HTTPStatus.NOT_FOUND, "There is nothing at '{}'.".format(url.path))
+        raise ServiceError(HTTPStatus.METHOD_NOT_ALLOWED, "'{}' can not be used with '{}'."
+                           .format(method, url.path))
+
+    # Return the household with the given name.
+    #
+    # @param household_name the name of the household
+    # @return the Household object
+    # @exception ServiceError raised if the household does not exist
+    #
+    def find_household(self, household_name):
+        household = self.all_households.get(household_name)
+        if household is None:
+            raise ServiceError(HTTPStatus.NOT_FOUND, "The household '{}' does not exist.".format(household_name))
+        return household
+
+    # Create a household and add it to the registry, checking it the same way as the menu does.
+    #
+    # @param body a dictionary with the household "name", a list of "participants" names, and
+    #        a list of "chores", each a dictionary with a "name" and a "frequency"
+    # @return the new household as JSON
+    # @exception ServiceError raised if the household is not valid or already exists
+    #
+    def create_household(self, body):
+        try:
+            household_name = body["name"]
+            names = body["participants"]
+            chores = [Chore(chore["name"], chore["frequency"]) for chore in body["chores"]]
+            if household_name in self.all_households:
+                raise ServiceError(HTTPStatus.CONFLICT, "Household {} already exists.".format(household_name))
+            household = Household(household_name, names, chores)
+        except (KeyError, TypeError, ValueError, AttributeError) as err:
+            if isinstance(err, KeyError):
+                err = "The household should have a {}.".format(err)
+            raise ServiceError(HTTPStatus.BAD_REQUEST, str(err).strip())
+        # The new household has not been saved yet
+        household.dirty = True
+        self.all_households.add(household)
+        return household_json(household)
+
+    # Log the number of times a participant has done a chore. Nothing is awaited between checking
+    # the count and logging it, so no other request can change the household in between.
+    #
+    # @param household_name the name of the household
+    # @param body a dictionary with the "participant", the "chore" and the "count" to add
+    # @return a dictionary of the participant, chore and their new total
+    # @exception ServiceError raised if the household, participant or chore does not exist,
+    #            or the count is not valid
+    #
+    def log_chores(self, household_name, body):
+        household = self.find_household(household_name)
+        try:
+            name, chore, number_completed = body["participant"], body["chore"], body["count"]
+        except (KeyError, TypeError):
+            raise ServiceError(HTTPStatus.BAD_REQUEST,
+                               "The update should have a participant, chore and count.")
+        log = household.chore_log
+        if name not in log:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "The participant '{}' is not in the household."
+                               .format(name))
+        if chore not in log[name]:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "The chore '{}' is not one of the household's chores."
+                               .format(chore))
+        try:
+            Household.is_valid_number_completed(number_completed, household.week_count(name, chore))
+        except ValueError as err:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "That is not a valid number completed. " + str(err))
+        household.update_log(name, chore, int(number_completed))
+        return {"participant": name, "chore": chore, "count": log[name][chore]}
+
+    # Return a household's leaderboard, with each participant's place across all households
+    # if there is a leaderboard of every household.
+    #
+    # @param household_name the name of the household
+    # @param weeks the number of weeks up to this week to count as a string, or None for all time
+    # @return a list of dictionaries, most points first
+    # @exception ServiceError raised if the household does not exist or the number of weeks is not valid
+    #
+    def household_leaderboard(self, household_name, weeks=None):
+        household = self.find_household(household_name)
+        weeks = parse_weeks(weeks)
+        scores = []
+        for place, entry in enumerate(leaderboard_entries(household, weeks), 1):
+            result = score_json(entry.score, place)
+            # The leaderboard of every household is of all time
+            if weeks is None:
+                result["overall_place"] = None if self.leaderboard is None else \
+                    self.leaderboard.rank_of(household_name, entry.score.name)
+            scores.append(result)
+        return scores
+
+    # Return how a household kept up with its chores in a week.
+    #
+    # @param household_name the name of the household
+    # @param weeks_ago the number of weeks before this week, as a string
+    # @return a dictionary of the household's compliance
+    # @exception ServiceError raised if the household does not exist or the number of weeks is not valid
+    #
+    def household_compliance(self, household_name, weeks_ago):
+        household = self.find_household(household_name)
+        if not weeks_ago.isdigit():
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "The number of weeks ago should be a whole number.")
+        compliance = household_compliance(household, week_of() - int(weeks_ago))
+        return {"household": compliance.household_name, "week": compliance.week,
+                "expected": compliance.expected, "actual": compliance.actual,
+                "behind": [chore.chore for chore in chores_behind(compliance)],
+                "chores": [chore._asdict() for chore in compliance.chores],
+                "participants": [dict(participant._asdict(), expected=round(participant.expected, 2))
+                                 for participant in compliance.participants]}
+
+    # Return the participants with the most points across all households.
+    #
+    # @param number the number of participants to return, as a string
+    # @param weeks the number of weeks up to this week to count as a string, or None for all time
+    # @return a list of dictionaries, most points first
+    # @exception ServiceError raised if the number or the number of weeks is not valid
+    #
+    def top(self, number, weeks=None):
+        if not number.isdigit():
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "The number of participants should be a whole number.")
+        weeks = parse_weeks(weeks)
+        if self.leaderboard is not None and weeks is None:
+            scores = self.leaderboard.top(int(number))
+        else:
+            scores = top_housemates(self.all_households, int(number), weeks=weeks)
+        return [score_json(score, place) for place, score in enumerate(scores, 1)]
+
+
+# Read the number of weeks a leaderboard counts from a query string.
+#
+# @param weeks the number of weeks as a string, or None for all time
+# @return the number of weeks, or None for all time
+# @exception ServiceError raised if the number of weeks is not a whole number from 1 to the weeks kept
+#
+def parse_weeks(weeks):
+    if weeks is None:
+        return None
+    if not weeks.isdigit() or not 1 <= int(weeks) <= ChoreHistory.WEEKS:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "The number of weeks should be a whole number from 1 to {}."
+                           .format(ChoreHistory.WEEKS))
+    return int(weeks)
+
+
+# Read an HTTP request from a connection.
+#
+# @param reader the asyncio.StreamReader of the connection
+# @return a tuple of the method, the target and the decoded JSON body, or None if there was no body
+# @exception ServiceError raised if the request can not be read
+#
+async def read_request(reader):
+    request_line = (await reader.readline()).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "The request line could not be read.")
+    content_length = 0
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        header, _, value = line.partition(":")
+        if header.strip().lower() == "content-length":
+            if not value.strip().isdigit():
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "The Content-Length should be a whole number.")
+            content_length = int(value)
+    if content_length > MAXIMUM_BODY_LENGTH:
+        raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "The request body is too long.")
+    body = None
+    if content_length:
+        try:
+            body = json.loads((await reader.readexactly(content_length)).decode("utf-8"))
+        except ValueError:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "The request body should be JSON.")
+    return request_line[0].upper(), request_line[1], body
+
+
+# Make the bytes of an HTTP response.
+#
+# @param status the HTTPStatus of the response
+# @param result the result to be sent as JSON
+# @return the bytes to write to the connection
+#
+def response_bytes(status, result):
+    body = json.dumps(result).encode("utf-8")
+    head = ("HTTP/1.1 {} {}\r\n"
+            "Content-Type: application/json\r\n"
+            "Content-Length: {}\r\n"
+            "Connection: close\r\n\r\n").format(status.value, status.phrase, len(body))
+    return head.encode("latin-1") + body
+
+
+# Return a household and its chore log as a dictionary which can be sent as JSON.
+#
+# @param household a Household object
+# @return a dictionary
+#
+def household_json(household):
+    return {"name": household.household_name,
+            "participants": list(household.participants.participants),
+            "chores": [{"name": chore.chore_name, "frequency": int(chore.frequency)}
+                       for chore in household.chores.chores],
+            "chore_log": {name: dict(household.chore_log[name]) for name in household.chore_log}}
+
+
+# Return a participant's place on a leaderboard as a dictionary which can be sent as JSON.
+#
+# @param score a Score
+# @param place the participant's place, where 1 is the most points
+# @return a dictionary
+#
+def score_json(score, place):
+    return {"place": place, "household": score.household_name, "participant": score.name,
+            "points": score.points}
+
+
+# Start the service and serve clients until it is stopped.
+#
+# @param all_households a HouseholdRegistry of household objects
+# @param host the address to listen on, which defaults to this computer only
+# @param port the port to listen on
+# @param leaderboard a Leaderboard listening to the registry, or None
+#
+async def serve(all_households, host="127.0.0.1", port=8080, leaderboard=None):
+    service = ChoreService(all_households, leaderboard)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print("\n\tServing Chore Chart on http://{}:{}/".format(*server.sockets[0].getsockname()[:2]))
+    async with server:
+        await server.serve_forever()
+
+
+# main method
+#
+# Contains some simple tests, run against a service on this computer only
+#
+def main():
+    from household_registry_module import HouseholdRegistry
+
+    # Send a request to the service and return the status and decoded JSON result
+    async def request(port, method, path, body=None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        writer.write("{} {} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {}\r\n\r\n"
+                     .format(method, path, len(data)).encode("latin-1") + data)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(body.decode("utf-8"))
+
+    async def run_tests():
+        service = ChoreService(HouseholdRegistry())
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        house = {"name": "House", "participants": ["personA", "personB"],
+                 "chores": [{"name": "wash up", "frequency": 4}, {"name": "dusting", "frequency": 1}]}
+
+        print("Test 1: Create a valid household")
+        print("\n\t", *(await request(port, "POST", "/households", house)))
+
+        print("\nTest 2: Create a household with a name that is already used")
+        print("\n\t", *(await request(port, "POST", "/households", house)))
+
+        print("\nTest 3: Create a household with an invalid chore frequency")
+        print("\n\t", *(await request(port, "POST", "/households",
+                                      dict(house, name="Flat", chores=[{"name": "wash up", "frequency": 25},
+                                                                       {"name": "dusting", "frequency": 1}]))))
+
+        print("\nTest 4: Log a number completed past the maximum")
+        print("\n\t", *(await request(port, "POST", "/households/House/log",
+                                      {"participant": "personA", "chore": "dusting", "count": 51})))
+
+        print("\nTest 5: Log chores from 50 clients at once")
+        await asyncio.gather(*(request(port, "POST", "/households/House/log",
+                                       {"participant": "personA", "chore": "wash up", "count": 1})
+                               for i in range(50)))
+        print("\n\t", *(await request(port, "GET", "/households/House")))
+
+        print("\nTest 6: Show the leaderboard")
+        print("\n\t", *(await request(port, "GET", "/leaderboard?top=1")))
+
+        print("\nTest 7: Show the household's leaderboard for the last 4 weeks")
+        print("\n\t", *(await request(port, "GET", "/households/House/leaderboard?weeks=4")))
+
+        print("\nTest 8: Show how the household is keeping up with its chores this week")
+        print("\n\t", *(await request(port, "GET", "/households/House/compliance")))
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run_tests())
+
+
+if __name__ == "__main__":
+    main()
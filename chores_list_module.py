@@ -1,28 +1,125 @@
+import sys
+
+
 class ChoresList:
+    # Instances have no __dict__, so each one only takes the memory of its attributes
+    __slots__ = ("_chores", "_positions")
+
     MINIMUM_NUMBER_OF_CHORES = 2
     MAXIMUM_NUMBER_OF_CHORES = 5
 
     def __init__(self, the_chores):
         self.chores = the_chores
 
-    # Return the chores attribute.
+    # Create a ChoresList from chores which have already been validated, such as those
+    # read from a checked line of the households file, without checking them again.
+    # The interactive and API input must use the constructor instead.
+    #
+    # @param the_chores a valid set of Chore objects, or a list of them to keep them in that order
+    # @return a ChoresList object
+    #
+    @classmethod
+    def from_validated(cls, the_chores):
+        chores_list = cls.__new__(cls)
+        chores_list._set_chores(the_chores)
+        return chores_list
+
+    # Return the chores attribute, a list of the Chore objects in the order they were given in.
+    # It must not be changed by the caller, as the chore names' positions are kept alongside it.
     #
     @property
     def chores(self):
         return self._chores
 
     # Sets the chores attribute.
-    # The chores attribute is a set of Chore objects.
+    # The chores are given as a set of Chore objects, or a list of them to keep them in that order.
     #
     #  @param chores - the chores        
     @chores.setter
     def chores(self, the_chores):
         try:
             self.valid_chores(the_chores)
-            self._chores = the_chores
+            self._set_chores(the_chores)
         except ValueError as err:
             raise
 
+    def __len__(self):
+        return len(self._chores)
+
+    # Return a chore from its number, which is its position counting from 1 in the
+    # order the chores are shown.
+    #
+    # @param number the chore's number
+    # @return the Chore object
+    # @exception IndexError raised if there is no chore with the number
+    #
+    def chore_at(self, number):
+        if number < 1:
+            raise IndexError("There is no chore number {}.".format(number))
+        return self._chores[number - 1]
+
+    # Return the number of a chore, which is its position counting from 1 in the order
+    # the chores are shown.
+    #
+    # @param chore_name the name of the chore
+    # @return the chore's number
+    # @exception KeyError raised if there is no chore with the name
+    #
+    def chore_number(self, chore_name):
+        return self._positions[chore_name] + 1
+
+    # Return the chore with the given name, found through the chore names' positions
+    # without looking at the other chores.
+    #
+    # @param chore_name the name of the chore
+    # @return the Chore object, or None if there is no chore with the name
+    #
+    def get(self, chore_name):
+        position = self._positions.get(chore_name)
+        return None if position is None else self._chores[position]
+
+    # Add a chore to the end of the list. The number of chores is not checked, so a list
+    # can be built up one chore at a time from ChoresList.from_validated(()) and its length
+    # checked with is_valid_length once it is finished.
+    # A household's chores should not be changed this way, as its chore log would not match.
+    #
+    # @param chore a Chore object
+    # @exception TypeError raised if the chore is not a Chore object
+    # @exception ValueError raised if there is already a chore with the same name
+    #
+    def add(self, chore):
+        if not isinstance(chore, Chore):
+            raise TypeError("The ChoreList does not contain objects which are Chores.")
+        ChoresList.is_unique(chore.chore_name, self)
+        self._positions[chore.chore_name] = len(self._chores)
+        self._chores.append(chore)
+
+    # Remove a chore. The chores after it move up one place, so only their positions change.
+    #
+    # @param chore_name the name of the chore
+    # @return the removed Chore object
+    # @exception KeyError raised if there is no chore with the name
+    #
+    def remove(self, chore_name):
+        position = self._positions.pop(chore_name)
+        chore = self._chores.pop(position)
+        for later_position in range(position, len(self._chores)):
+            self._positions[self._chores[later_position].chore_name] = later_position
+        return chore
+
+    # Return the memory used by the chores in bytes, not counting the chore names, which are
+    # shared by every household. Used by sys.getsizeof.
+    #
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self._chores) + sys.getsizeof(self._positions) + \
+            sum(sys.getsizeof(chore) for chore in self._chores)
+
+    # Keep the chores in order along with a dictionary of each chore name's position.
+    #
+    def _set_chores(self, the_chores):
+        self._chores = list(the_chores)
+        self._positions = {chore.chore_name: position for position, chore in enumerate(self._chores)}
+
     def __str__(self):
         length = len(self.chores)
         i = 1
@@ -35,32 +132,31 @@ class ChoresList:
 
         return chore_string
 
-    # Check whether a chore name exists in the set of chores.
+    # Check whether a chore name exists in the set of chores, through the index of chore names.
     #
     # @param chore_name
     # @return True if the chore name exists in the set, False if it does not.
     def chore_exists(self, chore_name):
-        found = False
-        for chore in self.chores:
-            if chore_name == chore.chore_name:
-                found = True
-
-        return found
+        return chore_name in self._positions
 
     # Check the set of chores.
+    # A list of chores is also checked for chores with the same name.
     # 
-    # @param chores the set of chores to be validated
+    # @param chores the set, or list, of chores to be validated
     # @return True if the set conforms to the validation conditions
     #         and raise exception if it does not.
     #
     @staticmethod
     def valid_chores(the_chores):
-        # Check that the_chores is a set
-        if not isinstance(the_chores, set):
-            raise TypeError("List of chores is not a set.")
+        # Check that the_chores is a set or a list
+        if not isinstance(the_chores, (set, list, tuple)):
+            raise TypeError("List of chores is not a set or a list.")
         try:
             ChoresList.is_valid_length(the_chores)
             ChoresList.is_valid_chores(the_chores)
+            # Chores are equal when their names are, so a set of them has each name once
+            if len(set(the_chores)) < len(the_chores):
+                raise ValueError("The chores' names must all be different.")
         except ValueError as err:
             raise
 
@@ -97,24 +193,28 @@ class ChoresList:
         return True
 
     # Check whether a chore name exists in a set of chores.
+    # A ChoresList is checked through its index of chore names without looking at
+    # every chore, which is how a list being built up one chore at a time is checked.
     #
     # @param chore_name the name of the chore
-    # @param the_chores the set of chores
+    # @param the_chores the ChoresList, or the set of chores
     # @return True if the set does not contain a chore with the name chore_name
     #         and raise exception if it does.
     #
     @staticmethod
     def is_unique(chore_name, the_chores):
-        if not isinstance(the_chores, set):
+        if isinstance(the_chores, ChoresList):
+            found = the_chores.chore_exists(chore_name)
+        elif not isinstance(the_chores, set):
             raise TypeError("The ChoreList is not a set.")
-
-        found = False
-
-        for chore in the_chores:
-            if not isinstance(chore, Chore):
-                raise TypeError("The ChoreList does not contain objects which are Chores.")
-            if chore_name == chore.chore_name:
-                found = True
+        else:
+            found = False
+            for chore in the_chores:
+                if not isinstance(chore, Chore):
+                    raise TypeError("The ChoreList does not contain objects which are Chores.")
+                if chore_name == chore.chore_name:
+                    found = True
+                    break
 
         if found:
             raise ValueError("\t\tChore: {} already exists in the set".format(chore_name))
@@ -123,6 +223,9 @@ class ChoresList:
 
 
 class Chore:
+    # Instances have no __dict__, so each one only takes the memory of its attributes
+    __slots__ = ("_chore_name", "_frequency", "_label")
+
     # Constants used for validation
     MINIMUM_NAME_LENGTH = 3  # Used to validate team member's name, household name and chore name
     MAXIMUM_NAME_LENGTH = 20
@@ -131,9 +234,25 @@ class Chore:
     MAXIMUM_CHORE_FREQUENCY = 20
 
     def __init__(self, the_chore_name, the_frequency):
+        self._label = None  # The string returned by __str__, made when it is first needed
         self.chore_name = the_chore_name
         self.frequency = the_frequency
 
+    # Create a Chore from a name and frequency which have already been validated,
+    # without checking them again.
+    #
+    # @param the_chore_name a valid chore name
+    # @param the_frequency a valid chore frequency
+    # @return a Chore object
+    #
+    @classmethod
+    def from_validated(cls, the_chore_name, the_frequency):
+        chore = cls.__new__(cls)
+        chore._chore_name = sys.intern(the_chore_name)
+        chore._frequency = the_frequency
+        chore._label = None
+        return chore
+
     # Return the chore name.
     #          
     @property
@@ -146,7 +265,9 @@ class Chore:
     def chore_name(self, the_chore_name):
         try:
             self.is_valid_chore_name(the_chore_name)
-            self._chore_name = the_chore_name
+            # The same chore name is shared by every household instead of each having a copy
+            self._chore_name = sys.intern(the_chore_name)
+            self._label = None
         except ValueError as err:
             raise
 
@@ -162,6 +283,7 @@ class Chore:
         try:
             self.is_valid_frequency(the_frequency)
             self._frequency = the_frequency
+            self._label = None
         except ValueError as err:
             raise
 
@@ -175,7 +297,9 @@ class Chore:
         return hash(self.chore_name)
 
     def __str__(self):
-        return self.chore_name + " (" + str(self.frequency) + ")"
+        if self._label is None:
+            self._label = "{} ({})".format(self._chore_name, self._frequency)
+        return self._label
 
     # Check the name contains only alphanumeric
     # characters and check that it is the right length.
@@ -265,6 +389,26 @@ def main():
     except Exception as err:
         print("\tERROR: ", err)
 
+    print("\nTest 5: Build a chore list one chore at a time, then add a duplicate")
+    try:
+        cl1 = ChoresList.from_validated(())
+        cl1.add(Chore("wash up", 4))
+        cl1.add(Chore("dusting", 1))
+        cl1.add(Chore("empty bin", 2))
+        cl1.remove("dusting")
+        print("\n\tVALID: ", cl1, cl1.chore_exists("dusting"), cl1.chore_number("empty bin"))
+        cl1.add(Chore("wash up", 3))
+        print("\n\tVALID: ", cl1)
+    except Exception as err:
+        print("\tERROR: ", err)
+
+
+    print("\nTest 6: Create a chore list from a list, keeping it in order, then from a list with a name twice")
+    try:
+        print("\n\tVALID: ", ChoresList([Chore("wash up", 4), Chore("dusting", 1), Chore("empty bin", 2)]))
+        print("\n\tVALID: ", ChoresList([Chore("wash up", 4), Chore("dusting", 1), Chore("wash up", 2)]))
+    except Exception as err:
+        print("\tERROR: ", err)
 
 if __name__ == "__main__":
     main()
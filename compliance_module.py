@@ -0,0 +1,152 @@
+from collections import namedtuple
+
+from household_module import week_of
+
+# How a household is keeping up with its chores in a week. A chore's frequency is the number
+# of times a week it needs doing, which is shared equally between the participants.
+# household_name : the name of the household
+# week : the week number
+# expected : the number of chores the household should do in the week, the sum of the frequencies
+# actual : the number of chores the household did in the week, counting each chore at most as
+#          many times as its frequency, so doing one chore more often does not make up for another
+# chores : a ChoreCompliance for each chore, in the order of the household's chores
+# participants : a ParticipantCompliance for each participant, in the order of the household's participants
+
+HouseholdCompliance = namedtuple("HouseholdCompliance", ["household_name", "week", "expected", "actual",
+                                                         "chores", "participants"])
+
+# How often a chore was done in a week
+# chore : the name of the chore
+# expected : the chore's frequency
+# actual : the number of times anyone did the chore in the week
+
+ChoreCompliance = namedtuple("ChoreCompliance", ["chore", "expected", "actual"])
+
+# How many chores a participant did in a week
+# name : the name of the participant
+# expected : the participant's share of the household's chores, which may be a fraction
+# actual : the number of chores the participant did in the week
+
+ParticipantCompliance = namedtuple("ParticipantCompliance", ["name", "expected", "actual"])
+
+
+# Check whether a chore or participant was done at least as many times as expected.
+#
+# @param compliance a ChoreCompliance or ParticipantCompliance
+# @return True if it is on track, False if it is behind
+#
+def on_track(compliance):
+    return compliance.actual >= compliance.expected
+
+
+# Return the chores a household is behind with. Doing one chore more often does not make
+# up for another, so a household is only on track if none of its chores are behind.
+#
+# @param compliance a HouseholdCompliance
+# @return a list of ChoreCompliance tuples
+#
+def chores_behind(compliance):
+    return [chore for chore in compliance.chores if not on_track(chore)]
+
+
+# Work out how a household kept up with its chores in a week. The week's counts are added up
+# for every participant and chore in one pass over the household's history.
+#
+# @param household a Household object
+# @param week the week number, defaults to this week
+# @return a HouseholdCompliance
+#
+def household_compliance(household, week=None):
+    if week is None:
+        week = week_of()
+    log = household.chore_log
+    participant_totals, chore_totals = household.history.week_totals(week)
+    frequencies = {chore.chore_name: int(chore.frequency) for chore in household.chores.chores}
+    expected = sum(frequencies.values())
+    share = expected / len(log)
+    actual = sum(min(frequencies[chore], chore_actual) for chore, chore_actual in zip(log.chore_names(), chore_totals))
+    return HouseholdCompliance(household.household_name, week, expected, actual,
+                               [ChoreCompliance(chore, frequencies[chore], actual)
+                                for chore, actual in zip(log.chore_names(), chore_totals)],
+                               [ParticipantCompliance(name, share, actual)
+                                for name, actual in zip(log, participant_totals)])
+
+
+# Work out how every household kept up with its chores in a week.
+#
+# @param all_households a HouseholdRegistry of household objects
+# @param week the week number, defaults to this week
+# @param behind_only True to leave out the households which are on track with every chore
+# @return a generator of HouseholdCompliance tuples, in the order of the registry
+#
+def compliance_report(all_households, week=None, behind_only=False):
+    if week is None:
+        week = week_of()
+    for household in all_households:
+        compliance = household_compliance(household, week)
+        if not behind_only or chores_behind(compliance):
+            yield compliance
+
+
+# Format a household's compliance as text, marking what is behind.
+#
+# @param compliance a HouseholdCompliance
+# @return a string
+#
+def compliance_string(compliance):
+    lines = ["{} ({} of {} chores done in week {}){}".format(
+        compliance.household_name, compliance.actual, compliance.expected, compliance.week,
+        " BEHIND" if chores_behind(compliance) else "")]
+    lines.append("\tChores:")
+    for chore in compliance.chores:
+        lines.append("\t\t{} ({} of {}){}".format(chore.chore, chore.actual, chore.expected,
+                                                  "" if on_track(chore) else " behind"))
+    lines.append("\tParticipants:")
+    for participant in compliance.participants:
+        lines.append("\t\t{} ({} of {:g}){}".format(participant.name, participant.actual,
+                                                    round(participant.expected, 1),
+                                                    "" if on_track(participant) else " behind"))
+    return "\n".join(lines)
+
+
+# main method
+#
+# Contains some simple tests
+#
+def main():
+    import time
+    from household_module import Household, SECONDS_PER_DAY
+    from chores_list_module import Chore
+
+    print("Test 1: Report on a household which has done some of its chores this week")
+    try:
+        household = Household("House", {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)})
+        household.update_log("personA", "wash up", 4)
+        household.update_log("personB", "wash up", 1)
+        household.update_log("personB", "dusting", 1, time.time() - 7 * SECONDS_PER_DAY)
+        print("\n\tVALID: ", compliance_string(household_compliance(household)))
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 2: Report only the households which are behind")
+    try:
+        households = [household, Household("Flat", {"personA", "personB"}, {Chore("wash up", 1), Chore("dusting", 1)})]
+        households[1].update_log("personA", "wash up", 1)
+        households[1].update_log("personB", "dusting", 1)
+        print("\n\tVALID: ", [compliance.household_name for compliance in compliance_report(households, behind_only=True)])
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 3: Do one chore many more times than needed and miss another")
+    try:
+        household = Household("Loft", {"personA", "personB"}, {Chore("wash up", 2), Chore("dusting", 3)})
+        household.update_log("personA", "wash up", 9)
+        compliance = household_compliance(household)
+        print("\n\tVALID: ", compliance.actual, compliance.expected,
+              [chore.chore for chore in chores_behind(compliance)])
+    except Exception as err:
+        print("\tERROR: ", err)
+
+
+if __name__ == "__main__":
+    main()
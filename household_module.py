@@ -1,8 +1,322 @@
+import sys
+import threading
+import time
+from array import array
+from collections.abc import Mapping
+from operator import mul
+
 from participants_list_module import Participants
 from chores_list_module import ChoresList, Chore
 
 
+# The number of seconds in a day
+SECONDS_PER_DAY = 86400
+
+
+# Return the number of the week a time is in, counting the weeks from the start of the
+# epoch in UTC. The epoch started on a Thursday, so the days are moved on by 3 for the
+# weeks to start on a Monday.
+#
+# @param timestamp the time in seconds since the epoch, defaults to now
+# @return the week number
+#
+def week_of(timestamp=None):
+    if timestamp is None:
+        timestamp = time.time()
+    return (int(timestamp) // SECONDS_PER_DAY + 3) // 7
+
+
+class ChoreLog(Mapping):
+    __slots__ = ("_participant_index", "_chore_index", "_counts")
+
+    # Constructor for the ChoreLog class. The counts of the chores done are kept in a single
+    # array with a row for each participant and a column for each chore, and dictionaries
+    # map the names to their row and column.
+    #
+    # The chore log can be read like a dictionary of dictionaries but can not be changed
+    # through it, so chore_log["fred"]["chore1"] is the number of times fred has done chore1.
+    #
+    # @param the_participants the participants' names
+    # @param the_chores the chore names
+    #
+    def __init__(self, the_participants, the_chores):
+        self._participant_index = {name: row for row, name in enumerate(the_participants)}
+        self._chore_index = {chore: column for column, chore in enumerate(the_chores)}
+        self._counts = array("l", [0]) * (len(self._participant_index) * len(self._chore_index))
+
+    def __getitem__(self, name):
+        return ParticipantLog(self, self._participant_index[name])
+
+    def __iter__(self):
+        return iter(self._participant_index)
+
+    def __len__(self):
+        return len(self._participant_index)
+
+    def __contains__(self, name):
+        return name in self._participant_index
+
+    def __repr__(self):
+        return repr({name: dict(self[name]) for name in self})
+
+    # Return the memory used by the chore log in bytes, including its array and dictionaries.
+    # Used by sys.getsizeof.
+    #
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self._participant_index) + \
+            sys.getsizeof(self._chore_index) + sys.getsizeof(self._counts)
+
+    # Return the number of times a participant has done a chore.
+    #
+    # @param name the name of the participant
+    # @param chore the name of the chore
+    # @return the number of times completed
+    # @exception KeyError raised if the participant or chore is not in the chore log
+    #
+    def count(self, name, chore):
+        return self._counts[self._participant_index[name] * len(self._chore_index) + self._chore_index[chore]]
+
+    # Return the chore names in the order of the chore log's columns.
+    #
+    # @return a list of the chore names
+    #
+    def chore_names(self):
+        return list(self._chore_index)
+
+    # Return each participant's counts multiplied by the chore weights and added up. The
+    # multiplying and adding of each row is done by map and sum rather than a Python loop.
+    #
+    # @param weights a list of the weight of each chore, in the same order as iterating a participant's log
+    # @return a list of each participant's weighted total, in the same order as iterating the chore log
+    #
+    def weighted_totals(self, weights):
+        columns = len(self._chore_index)
+        counts = self._counts
+        return [sum(map(mul, counts[start:start + columns], weights))
+                for start in range(0, len(counts), columns)]
+
+    # Replace every count at once, such as with counts read from a file.
+    #
+    # @param counts an iterable of whole numbers, a row for each participant of a number for
+    #        each chore, in the same order as iterating the chore log and a participant's log
+    # @exception ValueError raised if there is not a count for every participant and chore
+    #
+    def set_counts(self, counts):
+        counts = array("l", counts)
+        if len(counts) != len(self._counts):
+            raise ValueError("There should be {} counts.".format(len(self._counts)))
+        self._counts = counts
+
+    # Add to the number of times a participant has done a chore.
+    #
+    # @param name the name of the participant
+    # @param chore the name of the chore
+    # @param number_completed the number to add on to the existing total
+    # @exception KeyError raised if the participant or chore is not in the chore log
+    #
+    def add(self, name, chore, number_completed):
+        self._counts[self._participant_index[name] * len(self._chore_index) + self._chore_index[chore]] += \
+            number_completed
+
+
+class ChoreHistory:
+    __slots__ = ("_chore_log", "_week", "_cells")
+
+    # The number of weeks kept
+    WEEKS = 52
+
+    # Constructor for the ChoreHistory class. The number of times each participant has done
+    # each chore is kept for each of the last WEEKS weeks, in a ring buffer for each participant
+    # and chore, so the weeks can be added up without going back over every chore logged.
+    # Only the participants and chores which have been logged have a ring buffer.
+    # The all time totals are kept by the chore log.
+    #
+    # @param chore_log the household's ChoreLog, which gives the participants' and chores' positions
+    #
+    def __init__(self, chore_log):
+        self._chore_log = chore_log
+        self._week = None  # The newest week logged
+        # A ring buffer of counts for each participant and chore, keyed by their place in the chore
+        # log's array. The count for a week is at the week number modulo WEEKS.
+        self._cells = {}
+
+    # Return the newest week logged, or None if nothing has been logged.
+    #
+    @property
+    def newest_week(self):
+        return self._week
+
+    # Add to the number of times a participant did a chore in a week. A week older than the
+    # weeks kept is only counted in the chore log's all time total.
+    #
+    # @param name the name of the participant
+    # @param chore the name of the chore
+    # @param number_completed the number to add on
+    # @param week the week number the chores were done in
+    # @exception KeyError raised if the participant or chore is not in the chore log
+    #
+    def add(self, name, chore, number_completed, week):
+        cell = self._cell(name, chore)
+        if self._week is None:
+            self._week = week
+        elif week > self._week:
+            self._advance(week)
+        elif week <= self._week - ChoreHistory.WEEKS:
+            return
+        counts = self._cells.get(cell)
+        if counts is None:
+            counts = self._cells[cell] = array("l", [0]) * ChoreHistory.WEEKS
+        counts[week % ChoreHistory.WEEKS] += number_completed
+
+    # Return the number of times a participant did a chore in one week.
+    #
+    # @param name the name of the participant
+    # @param chore the name of the chore
+    # @param week the week number, defaults to this week
+    # @return the number of times completed
+    # @exception KeyError raised if the participant or chore is not in the chore log
+    #
+    def count(self, name, chore, week=None):
+        return self.total(name, chore, 1, week)
+
+    # Return the number of times a participant did a chore in the weeks up to a week.
+    #
+    # @param name the name of the participant
+    # @param chore the name of the chore
+    # @param weeks the number of weeks, up to WEEKS
+    # @param week the week number of the last week, defaults to this week
+    # @return the number of times completed
+    # @exception KeyError raised if the participant or chore is not in the chore log
+    #
+    def total(self, name, chore, weeks=1, week=None):
+        counts = self._cells.get(self._cell(name, chore))
+        if counts is None:
+            return 0
+        return sum([counts[position] for position in self._positions(weeks, week)])
+
+    # Return each participant's counts in the weeks up to a week, multiplied by the chore
+    # weights and added up, the same as ChoreLog.weighted_totals does for all time.
+    #
+    # @param weights a list of the weight of each chore, in the same order as iterating a participant's log
+    # @param weeks the number of weeks, up to WEEKS
+    # @param week the week number of the last week, defaults to this week
+    # @return a list of each participant's weighted total, in the same order as iterating the chore log
+    #
+    def weighted_totals(self, weights, weeks=1, week=None):
+        columns = len(self._chore_log._chore_index)
+        totals = [0] * len(self._chore_log._participant_index)
+        positions = self._positions(weeks, week)
+        for cell, counts in self._cells.items():
+            row, column = divmod(cell, columns)
+            totals[row] += weights[column] * sum([counts[position] for position in positions])
+        return totals
+
+    # Return the number of times each participant did any chore, and each chore was done by
+    # anyone, in one week, adding up the counts in one pass over the participants and chores logged.
+    #
+    # @param week the week number, defaults to this week
+    # @return a tuple of a list of each participant's total, in the same order as iterating the
+    #         chore log, and a list of each chore's total, in the same order as iterating a participant's log
+    #
+    def week_totals(self, week=None):
+        columns = len(self._chore_log._chore_index)
+        participant_totals = [0] * len(self._chore_log._participant_index)
+        chore_totals = [0] * columns
+        positions = self._positions(1, week)
+        if positions:
+            position = positions[0]
+            for cell, counts in self._cells.items():
+                count = counts[position]
+                if count:
+                    row, column = divmod(cell, columns)
+                    participant_totals[row] += count
+                    chore_totals[column] += count
+        return participant_totals, chore_totals
+
+    # Return every week's counts which are not 0, such as for saving them.
+    #
+    # @return a list of (week number, participant, chore, count) tuples
+    #
+    def records(self):
+        if self._week is None:
+            return []
+        names = list(self._chore_log._participant_index)
+        chores = list(self._chore_log._chore_index)
+        records = []
+        for cell, counts in sorted(self._cells.items()):
+            row, column = divmod(cell, len(chores))
+            for week in range(self._week - ChoreHistory.WEEKS + 1, self._week + 1):
+                if counts[week % ChoreHistory.WEEKS]:
+                    records.append((week, names[row], chores[column], counts[week % ChoreHistory.WEEKS]))
+        return records
+
+    # Return the memory used by the history in bytes. Used by sys.getsizeof.
+    #
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self._cells) + \
+            sum(sys.getsizeof(counts) for counts in self._cells.values())
+
+    # Return the position in the chore log's array of a participant and chore.
+    #
+    def _cell(self, name, chore):
+        return self._chore_log._participant_index[name] * len(self._chore_log._chore_index) + \
+            self._chore_log._chore_index[chore]
+
+    # Return the positions in the ring buffers of the weeks kept out of a number of weeks up to a week.
+    #
+    def _positions(self, weeks, week):
+        if self._week is None:
+            return []
+        if week is None:
+            week = week_of()
+        weeks = range(max(week - weeks + 1, self._week - ChoreHistory.WEEKS + 1), min(week, self._week) + 1)
+        return [week % ChoreHistory.WEEKS for week in weeks]
+
+    # Move the newest week on, emptying the counts of the weeks which are reused.
+    #
+    def _advance(self, week):
+        positions = [past_week % ChoreHistory.WEEKS
+                     for past_week in range(max(self._week + 1, week - ChoreHistory.WEEKS + 1), week + 1)]
+        for counts in self._cells.values():
+            for position in positions:
+                counts[position] = 0
+        self._week = week
+
+
+class ParticipantLog(Mapping):
+    __slots__ = ("_chore_log", "_start")
+
+    # Constructor for the ParticipantLog class, a read only view of one participant's row
+    # of a chore log, keyed by chore name.
+    #
+    # @param chore_log the ChoreLog
+    # @param row the participant's row in the chore log
+    #
+    def __init__(self, chore_log, row):
+        self._chore_log = chore_log
+        self._start = row * len(chore_log._chore_index)
+
+    def __getitem__(self, chore):
+        return self._chore_log._counts[self._start + self._chore_log._chore_index[chore]]
+
+    def __iter__(self):
+        return iter(self._chore_log._chore_index)
+
+    def __len__(self):
+        return len(self._chore_log._chore_index)
+
+    def __contains__(self, chore):
+        return chore in self._chore_log._chore_index
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 class Household:
+    # Instances have no __dict__, so each one only takes the memory of its attributes
+    __slots__ = ("_household_name", "_participants", "_chores", "_chore_log", "_history", "listeners", "dirty",
+                 "lock", "version", "_renderings")
+
     # Constants used for validation
     MINIMUM_NAME_LENGTH = 3  # Used to validate household name 
     MAXIMUM_NAME_LENGTH = 10
@@ -11,20 +325,54 @@ class Household:
     MAXIMUM_HOUSEHOLD_SIZE = 5
 
     MINIMUM_CHORES_DONE = 1  # Used to validate the number of chores done
-    MAXIMUM_CHORES_DONE = 50
+    MAXIMUM_CHORES_DONE = 50  # The most times a participant can do a chore in one week
 
     # Constructor for the Household class. Initialises all the attributes including the chore log.
     #  
     # @param the_household_name a string containing the household name
-    # @param the_participants a Participants object containing
-    #        a set of the participants' names
-    # @param the_chores a ChoresList object containing a set of chores
+    # @param the_participants a set of the participants' names, or a list of them to keep them in that order
+    # @param the_chores a set of Chore objects, or a list of them to keep them in that order
     #
     def __init__(self, the_household_name, the_participants, the_chores):
+        # Counts the changes to the household, so that text made from it can be kept until it changes
+        self.version = 0
+        self._renderings = None  # Text made from the household, keyed by what it is, with the version it was made from
         self.household_name = the_household_name
         self.participants = the_participants
         self.chores = the_chores
         self.chore_log = {}  # This will still call the setter for the chore log
+        self._history = None  # The ChoreHistory, made when a chore is first logged
+        self.listeners = ()  # Objects told about every update to the chore log
+        self.dirty = False  # True if the household has changed since it was last saved
+        # Held while the chore log is updated. Each household has its own lock, so writers to
+        # different households do not wait for each other. It can be held around update_log
+        # to check a count and update it without another writer getting in between.
+        self.lock = threading.RLock()
+
+    # Create a household from values which have already been validated, such as those read
+    # from a checked line of the households file, without checking them again. The interactive
+    # and API input must use the constructor instead.
+    #
+    # @param the_household_name a valid household name
+    # @param the_participants a valid set of the participants' names, or a list of them to keep them in that order
+    # @param the_chores a valid set of Chore objects, or a list of them to keep them in that order
+    # @return a Household object
+    #
+    @classmethod
+    def from_validated(cls, the_household_name, the_participants, the_chores):
+        household = cls.__new__(cls)
+        household._household_name = sys.intern(the_household_name)
+        household._participants = Participants.from_validated(the_participants)
+        household._chores = ChoresList.from_validated(the_chores)
+        household._chore_log = Household.initialise_log(household._participants.participants,
+                                                         household._chores.chores)
+        household._history = None
+        household.listeners = ()
+        household.dirty = False
+        household.lock = threading.RLock()
+        household.version = 0
+        household._renderings = None
+        return household
 
     # Return the household_name.
     #          
@@ -38,7 +386,8 @@ class Household:
     def household_name(self, name):
         try:
             self.is_valid_name(name)
-            self._household_name = name
+            self._household_name = sys.intern(name)
+            self.version = self.version + 1
         except ValueError as err:
             raise
 
@@ -55,6 +404,7 @@ class Household:
     @participants.setter
     def participants(self, the_participants):
         self._participants = Participants(the_participants)
+        self.version = self.version + 1
 
     # Return the chores.
     # 
@@ -68,6 +418,7 @@ class Household:
     def chores(self, the_chores):
         try:
             self._chores = ChoresList(the_chores)
+            self.version = self.version + 1
         except (ValueError, TypeError) as err:
             raise
 
@@ -77,52 +428,144 @@ class Household:
     def chore_log(self):
         return self._chore_log
 
-    # Setter for the dictionary containing the log of tasks done.
+    # Setter for the ChoreLog containing the log of tasks done, which can be read like a dictionary.
     #  key : participant's name,
-    #  value :  dictionary containing the chore name and the number of times completed.
+    #  value :  read only dictionary containing the chore name and the number of times completed.
     #  @param the_chore_log an empty dictionary       
     @chore_log.setter
     def chore_log(self, the_chore_log):
         self._chore_log = Household.initialise_log(self.participants.participants, self.chores.chores)
+        self.version = self.version + 1
         return
 
+    # Return the ChoreHistory of the chores done in each of the last weeks.
+    #
+    @property
+    def history(self):
+        if self._history is None:
+            self._history = ChoreHistory(self._chore_log)
+        return self._history
+
     def __str__(self):
-        return self.chore_log_string()
+        return self.rendered("chore_log_string", Household.chore_log_string)
+
+    # Return the memory used by the household in bytes, including its participants, chores,
+    # chore log and the text made from it. Used by sys.getsizeof. The names are shared by
+    # every household, so they are not counted.
+    #
+    def __sizeof__(self):
+        size = object.__sizeof__(self) + sys.getsizeof(self._participants) + sys.getsizeof(self._chores) + \
+            sys.getsizeof(self._chore_log) + sys.getsizeof(self.lock)
+        if self._history is not None:
+            size = size + sys.getsizeof(self._history)
+        if self._renderings is not None:
+            size = size + sys.getsizeof(self._renderings) + \
+                sum(sys.getsizeof(rendering) for version, rendering in self._renderings.values())
+        return size
 
     # Generate a string representation of the chore log.
     #
     #  @return a string containing the information in the chore log
     def chore_log_string(self):
-        name_count = 1
-        chore_count = 1
-        chore_log_string = "\tParticipants:\n"
-        for name in self.participants.participants:
-            chore_log_string += "\t\t{}\n".format(str(name_count) + ". " + name)
-            name_count = name_count + 1
-        chore_log_string += "\n\tChores (Frequency):\n"
-        for chore in self.chores.chores:
-            chore_log_string += "\t\t{}\n".format(str(chore_count) + ". " + str(chore))
-            chore_count = chore_count + 1
-        return chore_log_string
+        return "".join(["\tParticipants:\n"] +
+                       ["\t\t{}. {}\n".format(number, name)
+                        for number, name in enumerate(self.participants.participants, 1)] +
+                       ["\n\tChores (Frequency):\n"] +
+                       ["\t\t{}. {}\n".format(number, chore)
+                        for number, chore in enumerate(self.chores.chores, 1)])
+
+    # Return something made from the household, such as its text, making it again only if
+    # the household has changed since it was last made. It must not be changed by the caller.
+    #
+    # @param key a string naming what is made, so that each is kept separately
+    # @param render a function taking the household and returning what is made from it
+    # @return what the render function returned for the household as it is now
+    #
+    # Listeners with a household_resized(household) method are told whenever something is
+    # made, as the household then uses more memory.
+    #
+    def rendered(self, key, render):
+        if self._renderings is None:
+            self._renderings = {}
+        # The version is read first, so a change made while rendering makes it out of date
+        version = self.version
+        cached = self._renderings.get(key)
+        if cached is None or cached[0] != version:
+            cached = self._renderings[key] = (version, render(self))
+            for listener in self.listeners:
+                household_resized = getattr(listener, "household_resized", None)
+                if household_resized is not None:
+                    household_resized(self)
+        return cached[1]
 
     # Update the chore log.
+    # Each of the household's listeners has its chore_logged method called with the update,
+    # which is how the update gets recorded in the chore journal.
+    # The household's lock is held for the update and the listeners, so updates from
+    # different threads are never lost and reach the listeners in the order they were made.
     #   @param name a string containing the name of the participant.
     #   @param chore  a string containing the name of the chore.
     #   @param number_completed the number to add on to the existing total.
+    #   @param timestamp the time the chores were done in seconds since the epoch, defaults to now,
+    #          which decides the week of the history they are counted in.
     #
-    # The format of the chore log is:
+    # The chore log reads as:
     # 
     # {"fred" : {"chore1": 0, "chore2": 0}, walt : {"chore1": 0, "chore2": 0}}
     #
-    def update_log(self, name, chore, number_completed):
-        # Creates a copy of the current chore_log
-        log_copy = self.chore_log[name].copy()
-        # Updates the value of the copy
-        log_copy[chore] += int(number_completed)
-        # Substitute the updated copy back into the chore_log
-        self.chore_log[name] = log_copy
+    def update_log(self, name, chore, number_completed, timestamp=None):
+        # The listeners are given the same time, so the update is saved in the same week
+        timestamp = int(time.time()) if timestamp is None else int(timestamp)
+        with self.lock:
+            # Adds to the count in place
+            self._chore_log.add(name, chore, int(number_completed))
+            self.history.add(name, chore, int(number_completed), week_of(timestamp))
+            self.dirty = True
+            self.version = self.version + 1
+            for listener in self.listeners:
+                listener.chore_logged(self, name, chore, int(number_completed), timestamp)
+        return self.chore_log
+
+    # Update the chore log with several updates at once, such as a batch of chore events being
+    # ingested. Listeners with a chores_logged(household, updates) method are given all the
+    # updates in one call, so that a storage can save them together, and the other listeners
+    # have their chore_logged method called for each update.
+    #   @param updates a list of (name, chore, number_completed, timestamp) tuples, where the
+    #          timestamp may be None for now.
+    #
+    def update_logs(self, updates):
+        now = int(time.time())
+        updates = [(name, chore, int(number_completed), now if timestamp is None else int(timestamp))
+                   for name, chore, number_completed, timestamp in updates]
+        if not updates:
+            return self.chore_log
+        with self.lock:
+            for name, chore, number_completed, timestamp in updates:
+                self._chore_log.add(name, chore, number_completed)
+                self.history.add(name, chore, number_completed, week_of(timestamp))
+            self.dirty = True
+            self.version = self.version + 1
+            for listener in self.listeners:
+                chores_logged = getattr(listener, "chores_logged", None)
+                if chores_logged is not None:
+                    chores_logged(self, updates)
+                else:
+                    for name, chore, number_completed, timestamp in updates:
+                        listener.chore_logged(self, name, chore, number_completed, timestamp)
         return self.chore_log
 
+    # Add to the all time total of the chore log without counting it in any week, such as
+    # for the totals read from storage, whose weeks are read separately. The household is not
+    # marked as changed and the listeners are not told, as the update is already in storage.
+    #   @param name a string containing the name of the participant.
+    #   @param chore  a string containing the name of the chore.
+    #   @param number_completed the number to add on to the existing total.
+    #
+    def add_total(self, name, chore, number_completed):
+        with self.lock:
+            self._chore_log.add(name, chore, int(number_completed))
+            self.version = self.version + 1
+
     # Check the name contains only characters from the alphabet and check that it is the right length.
     # 
     # @param name the string to be validated
@@ -138,23 +581,45 @@ class Household:
                               "must have a length between {} and {}.").format
                              (Household.MINIMUM_NAME_LENGTH, Household.MAXIMUM_NAME_LENGTH))
 
+    # Check the number of times a chore has been done is a whole number more than 0, and that
+    # adding it to the number already done in the same week does not take the week's total past
+    # the maximum.
+    #
+    # @param number_completed the number to be added, as a string or an integer
+    # @param current_completed the number already done in the week, as given by week_count
+    # @return True if the number is valid, raise ValueError if it is not.
+    #
+    @staticmethod
+    def is_valid_number_completed(number_completed, current_completed):
+        if str(number_completed).isdigit() is False or int(number_completed) <= 0 or \
+                int(number_completed) + int(current_completed) > Household.MAXIMUM_CHORES_DONE:
+            raise ValueError("The number completed in a week must be between 0 and {}."
+                             .format(Household.MAXIMUM_CHORES_DONE))
+        return True
+
+    # Return the number of times a participant has done a chore in the week of a time, which
+    # is what MAXIMUM_CHORES_DONE limits.
+    #
+    # @param name the name of the participant
+    # @param chore the name of the chore
+    # @param timestamp the time in seconds since the epoch, defaults to now
+    # @return the number of times completed that week
+    # @exception KeyError raised if the participant or chore is not in the chore log
+    #
+    def week_count(self, name, chore, timestamp=None):
+        return self.history.count(name, chore, week_of(timestamp))
+
     @staticmethod
     def initialise_log(the_participants, the_chores):
 
-        # Create a dictionary where the keys are the participant names
-        # and the values are another dictionary containing all the chore names
-        # as keys and the number of times completed as values.
+        # Create a ChoreLog where the keys are the participant names
+        # and the values are another mapping containing all the chore names
+        # as keys and the number of times completed as values, all starting at 0.
         #
         # Example:
         # 
         # {"fred" : {"chore1": 0, "chore2": 0}, walt : {"chore1": 0, "chore2": 0}}  
-        household_log = {}
-        chore_dictionary = {}
-        for chore in the_chores:
-            chore_dictionary[str(chore)[:-4]] = 0
-        for participant in the_participants:
-            household_log[participant] = chore_dictionary
-        return household_log
+        return ChoreLog(the_participants, [chore.chore_name for chore in the_chores])
 
 
 # main method
@@ -218,6 +683,50 @@ def main():
     except Exception as err:
         print("\tERROR: ", err)
 
+    print("\nTest 7: Update the logs of two households from 8 threads at once")
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+        households = [Household(name, {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)})
+                      for name in ("House", "Flat")]
+        updates = [(household, name, chore) for household in households for name in ("personA", "personB")
+                   for chore in ("wash up", "dusting")] * 5000
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda update: update[0].update_log(update[1], update[2], 1), updates))
+        counts = [household.chore_log[name][chore] for household in households
+                  for name in ("personA", "personB") for chore in ("wash up", "dusting")]
+        if counts != [5000] * len(counts):
+            raise ValueError("Updates were lost: {}".format(counts))
+        print("\n\tVALID: ", counts)
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 8: Count the chores done this week, in the last 4 weeks and of all time")
+    try:
+        h = Household("House", {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)})
+        now = time.time()
+        week = 7 * SECONDS_PER_DAY
+        h.update_log("personA", "wash up", 3, now)
+        h.update_log("personA", "wash up", 2, now - week)
+        h.update_log("personA", "wash up", 4, now - 10 * week)
+        h.update_log("personA", "wash up", 1, now - 60 * week)
+        print("\n\tVALID: ", h.history.count("personA", "wash up"), h.history.total("personA", "wash up", 4),
+              h.chore_log.count("personA", "wash up"), h.history.weighted_totals([1, 1], 52))
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 9: Log more than the maximum in total across two weeks, then too many in one week")
+    try:
+        h = Household("House", {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)})
+        now = time.time()
+        for timestamp in (now - 7 * SECONDS_PER_DAY, now):
+            Household.is_valid_number_completed(40, h.week_count("personA", "wash up", timestamp))
+            h.update_log("personA", "wash up", 40, timestamp)
+        print("\n\tVALID: ", h.chore_log["personA"]["wash up"], h.week_count("personA", "wash up"))
+        Household.is_valid_number_completed(11, h.week_count("personA", "wash up"))
+        print("\n\tVALID: ", h.chore_log["personA"]["wash up"])
+    except Exception as err:
+        print("\tERROR: ", err)
+
 
 if __name__ == "__main__":
     main()
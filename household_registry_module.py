@@ -0,0 +1,496 @@
+import heapq
+import sys
+from collections import namedtuple
+
+from household_module import Household
+
+
+class HouseholdRegistry:
+
+    # Constructor for the HouseholdRegistry class. The registry keeps the households
+    # in a dictionary keyed by household name so that lookups do not need to scan
+    # every household. Dictionaries keep insertion order, so iterating over the
+    # registry returns the households in the order they were added.
+    #
+    # @param the_households an optional iterable of Household objects to add
+    #
+    def __init__(self, the_households=()):
+        self._households = {}
+        # The households which have changed since they were last saved, keyed by name
+        self._dirty = {}
+        # The listeners are shared by every household in the registry, so adding
+        # a listener applies it to the households already added as well
+        # The registry listens to its own households to keep track of the changed ones
+        self.listeners = [self]
+        for household in the_households:
+            self.add(household)
+
+    def __len__(self):
+        return len(self._households)
+
+    def __iter__(self):
+        return iter(self._households.values())
+
+    def __contains__(self, household_name):
+        return household_name in self._households
+
+    # Check whether a household with the given name is in the registry.
+    #
+    # @param household_name the name of the household
+    # @return True if the household exists, False if it does not.
+    #
+    def exists(self, household_name):
+        return household_name in self._households
+
+    # Return the household with the given name.
+    #
+    # @param household_name the name of the household
+    # @return the Household object, or None if it does not exist.
+    #
+    def get(self, household_name):
+        return self._households.get(household_name)
+
+    # Return the names of the households in the registry.
+    #
+    # @return a list of the household names, in the order the households were added
+    #
+    def household_names(self):
+        return list(self._households)
+
+    # Add a household to the registry. The household is given the registry's listeners.
+    #
+    # @param household a Household object
+    # @exception TypeError raised if the household is not a Household object
+    # @exception ValueError raised if a household with the same name already exists
+    #
+    def add(self, household):
+        if not isinstance(household, Household):
+            raise TypeError("Only Household objects can be added to the registry.")
+        if household.household_name in self._households:
+            raise ValueError("The household name '{}' had already been used and can not be used again."
+                             .format(household.household_name))
+        household.listeners = self.listeners
+        self._households[household.household_name] = household
+        if household.dirty:
+            self._dirty[household.household_name] = household
+        # Listeners which keep something about every household, such as a leaderboard, are told about it
+        for listener in self.listeners:
+            household_added = getattr(listener, "household_added", None)
+            if household_added is not None:
+                household_added(household)
+
+    # Remove a household from the registry.
+    #
+    # @param household_name the name of the household
+    # @return the removed Household object
+    # @exception KeyError raised if the household does not exist
+    #
+    def remove(self, household_name):
+        household = self._households.pop(household_name)
+        self._dirty.pop(household_name, None)
+        for listener in self.listeners:
+            household_removed = getattr(listener, "household_removed", None)
+            if household_removed is not None:
+                household_removed(household)
+        household.listeners = ()
+        return household
+
+    # Add a listener to every household in the registry. The listener's
+    # chore_logged(household, name, chore, number_completed, timestamp) method is called
+    # whenever a household's chore log is updated, or, if it has one, its chores_logged(household,
+    # updates) method is called once for several updates made together. Its household_added(household) and
+    # household_removed(household) methods, if it has them, are called whenever a household
+    # is added to or removed from the registry.
+    #
+    # @param listener the object to be told about chore log updates
+    #
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    # Called by a household whenever its chore log is updated. Records that the household has changed.
+    #
+    # @param household the Household object that was updated
+    # @param name a string containing the name of the participant
+    # @param chore a string containing the name of the chore
+    # @param number_completed the number added on to the existing total
+    # @param timestamp the time the chores were done in seconds since the epoch
+    #
+    def chore_logged(self, household, name, chore, number_completed, timestamp):
+        self._dirty[household.household_name] = household
+
+    # Return the households which have changed since they were last saved, without
+    # looking at the households which have not.
+    #
+    # @return a list of Household objects
+    #
+    def dirty_households(self):
+        return [household for household in self._dirty.values() if household.dirty]
+
+    # Record that every household has been saved.
+    #
+    def mark_clean(self):
+        for household in self._dirty.values():
+            household.dirty = False
+        self._dirty = {}
+
+
+# The counts kept by a LazyHouseholdRegistry
+# hits : the lookups of a household which was already kept
+# misses : the lookups of a household which had to be read from the storage
+# evictions : the households let go to keep within the capacity
+# write_backs : the changed households saved to the storage as they were let go
+# households : the number of households kept
+# size : the memory used by the households kept, in bytes
+
+CacheStats = namedtuple("CacheStats", ["hits", "misses", "evictions", "write_backs", "households", "size"])
+
+# The ways of choosing which households to let go. "lru" lets go of the least recently used,
+# and "lfu" of the least often used, with the least recently used first among those used as often.
+
+POLICIES = ("lru", "lfu")
+
+
+class LazyHouseholdRegistry(HouseholdRegistry):
+
+    # Constructor for the LazyHouseholdRegistry class. The registry starts with only the names
+    # of the households, given by the storage when it is loaded, and a household is read from
+    # the storage the first time it is looked up. Once more households are kept than the
+    # capacity allows, households are let go, to be read again if they are needed. A household
+    # which has changed since it was saved is saved to the storage before it is let go.
+    #
+    # @param capacity the most households to keep, or None for no limit
+    # @param capacity_bytes the most memory the households kept can use, measured by
+    #        sys.getsizeof when each is read and again whenever it grows, or None for no limit
+    # @param policy one of POLICIES
+    # @exception ValueError raised if the policy is not one of POLICIES
+    #
+    def __init__(self, capacity=1000, capacity_bytes=None, policy="lru"):
+        if policy not in POLICIES:
+            raise ValueError("The policy '{}' is not one of {}.".format(policy, ", ".join(POLICIES)))
+        super().__init__()
+        self.capacity = capacity
+        self.capacity_bytes = capacity_bytes
+        self.policy = policy
+        self._names = {}  # Every household's name, in the order the storage gave them
+        self._loader = None
+        self._writer = None
+        # The memory used by each household kept, and the number of times it has been looked
+        # up along with when it was last looked up, keyed by household name
+        self._sizes = {}
+        self._uses = {}
+        self._clock = 0
+        # A heap of the (uses, household name) of the households kept for the "lfu" policy, with
+        # the least used first. An entry is left in the heap when the household is used again or
+        # let go, and skipped as out of date when it reaches the top.
+        self._least_used = []
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.write_backs = 0
+
+    # Give the registry the names of the households in the storage and the functions used to
+    # read and save a household. Called by the storage when it is loaded.
+    #
+    # @param household_names an iterable of the household names
+    # @param loader a function taking a household name which returns the Household object read
+    #        from the storage, or None if it could not be read
+    # @param writer a function taking a list of changed Household objects which saves them to
+    #        the storage, or None to keep changed households until the registry is saved
+    #
+    def index_households(self, household_names, loader, writer=None):
+        self._names = dict.fromkeys(household_names)
+        self._loader = loader
+        self._writer = writer
+
+    def __len__(self):
+        return len(self._names)
+
+    # Iterating the registry reads every household, keeping only as many as the capacity allows.
+    #
+    def __iter__(self):
+        for household_name in list(self._names):
+            household = self.get(household_name)
+            if household is not None:
+                yield household
+
+    def __contains__(self, household_name):
+        return household_name in self._names
+
+    # A household which is named by the storage but is not valid does not exist, so the
+    # household is read to find out.
+    #
+    def exists(self, household_name):
+        return self.get(household_name) is not None
+
+    # Return the counts of the lookups and the households let go.
+    #
+    # @return a CacheStats tuple
+    #
+    def stats(self):
+        return CacheStats(self.hits, self.misses, self.evictions, self.write_backs, len(self._households), self._size)
+
+    # Return the names of the households in the registry, without reading any household.
+    # A household which is named by the storage but is not valid is included until it is read.
+    #
+    # @return a list of the household names, in the order the storage gave them
+    #
+    def household_names(self):
+        return list(self._names)
+
+    # Return the household with the given name if it is kept, without reading it from the
+    # storage or counting it as a lookup.
+    #
+    # @param household_name the name of the household
+    # @return the Household object, or None if it is not kept.
+    #
+    def kept(self, household_name):
+        return self._households.get(household_name)
+
+    # Return the household with the given name, reading it from the storage if it is not
+    # already kept.
+    #
+    # @param household_name the name of the household
+    # @return the Household object, or None if it does not exist or could not be read.
+    #
+    def get(self, household_name):
+        # The households are kept in a dictionary in least recently used order, so a
+        # household is moved to the end each time it is used
+        household = self._households.pop(household_name, None)
+        if household is None:
+            if household_name not in self._names or self._loader is None:
+                return None
+            self.misses = self.misses + 1
+            household = self._loader(household_name)
+            if household is None:
+                # The household is not valid, so it is omitted from then on
+                del self._names[household_name]
+                return None
+            household.listeners = self.listeners
+            self._keep(household)
+        else:
+            self.hits = self.hits + 1
+        self._households[household_name] = household
+        self._use(household_name, self._uses[household_name][0] + 1)
+        self.evict(household_name)
+        return household
+
+    # Add a household to the registry. The household is given the registry's listeners.
+    #
+    # @param household a Household object
+    # @exception TypeError raised if the household is not a Household object
+    # @exception ValueError raised if a household with the same name already exists
+    #
+    def add(self, household):
+        if isinstance(household, Household) and self.exists(household.household_name):
+            raise ValueError("The household name '{}' had already been used and can not be used again."
+                             .format(household.household_name))
+        super().add(household)
+        self._names[household.household_name] = None
+        self._keep(household)
+        self.evict(household.household_name)
+
+    # Remove a household from the registry.
+    #
+    # @param household_name the name of the household
+    # @return the removed Household object, or None if it was not kept
+    # @exception KeyError raised if the household does not exist
+    #
+    def remove(self, household_name):
+        del self._names[household_name]
+        if household_name in self._households:
+            self._forget(household_name)
+            return super().remove(household_name)
+        return None
+
+    # Let go of households until they are within the capacity. A household which has changed
+    # is saved first, or kept if there is no way to save it.
+    #
+    # @param keep the name of a household which is not let go, such as the one just looked up
+    #
+    def evict(self, keep=None):
+        if not self._over_capacity():
+            return
+        if self.policy == "lfu":
+            # The households which can not be let go are put back once the others have been
+            skipped = []
+            while self._least_used and self._over_capacity():
+                uses, household_name = heapq.heappop(self._least_used)
+                if self._uses.get(household_name) == uses and not self._let_go(household_name, keep):
+                    skipped.append((uses, household_name))
+            for entry in skipped:
+                heapq.heappush(self._least_used, entry)
+        else:
+            for household_name in list(self._households):
+                if not self._over_capacity():
+                    break
+                self._let_go(household_name, keep)
+
+    # Let go of a household, saving it first if it has changed.
+    #
+    # @param household_name the name of a household which is kept
+    # @param keep the name of a household which is not let go
+    # @return True if the household was let go, False if it was kept
+    #
+    def _let_go(self, household_name, keep):
+        if household_name == keep:
+            return False
+        household = self._households[household_name]
+        if household.dirty or household_name in self._dirty:
+            if self._writer is None:
+                return False
+            self._writer([household])
+            household.dirty = False
+            self._dirty.pop(household_name, None)
+            self.write_backs = self.write_backs + 1
+        del self._households[household_name]
+        self._forget(household_name)
+        household.listeners = ()
+        self.evictions = self.evictions + 1
+        return True
+
+    # Called by a household whenever its chore log is updated. Records that the household has
+    # changed and measures it again, as its history and renderings may have grown.
+    #
+    # @param household the Household object that was updated
+    # @param name a string containing the name of the participant
+    # @param chore a string containing the name of the chore
+    # @param number_completed the number added on to the existing total
+    # @param timestamp the time the chores were done in seconds since the epoch
+    #
+    def chore_logged(self, household, name, chore, number_completed, timestamp):
+        super().chore_logged(household, name, chore, number_completed, timestamp)
+        self.household_resized(household)
+
+    # Called by a household whenever it makes something from itself that it keeps, such as its
+    # text. Measures the household again and lets go of others if it is now over the capacity.
+    #
+    # @param household the Household object which has grown
+    #
+    def household_resized(self, household):
+        household_name = household.household_name
+        if self._households.get(household_name) is not household:
+            return
+        size = sys.getsizeof(household)
+        self._size = self._size + size - self._sizes[household_name]
+        self._sizes[household_name] = size
+        self.evict(household_name)
+
+    def _over_capacity(self):
+        return (self.capacity is not None and len(self._households) > self.capacity) or \
+               (self.capacity_bytes is not None and self._size > self.capacity_bytes)
+
+    # Start counting the memory and lookups of a household as it is kept.
+    #
+    def _keep(self, household):
+        size = sys.getsizeof(household)
+        self._sizes[household.household_name] = size
+        self._size = self._size + size
+        self._use(household.household_name, 0)
+
+    # Stop counting the memory and lookups of a household as it is let go.
+    #
+    def _forget(self, household_name):
+        self._size = self._size - self._sizes.pop(household_name)
+        del self._uses[household_name]
+
+    # Record the number of times a household has been looked up, as the latest one looked up.
+    #
+    def _use(self, household_name, uses):
+        self._clock = self._clock + 1
+        # The households looked up as often are let go least recently used first
+        self._uses[household_name] = (uses, self._clock)
+        if self.policy == "lfu":
+            heapq.heappush(self._least_used, (self._uses[household_name], household_name))
+            # The heap is made again from the households kept once most of its entries are out of date
+            if len(self._least_used) > 2 * len(self._uses) + 16:
+                self._least_used = [(uses, household_name) for household_name, uses in self._uses.items()]
+                heapq.heapify(self._least_used)
+
+
+# main method
+#
+# Contains some simple tests
+#
+def main():
+    from chores_list_module import Chore
+
+    print("Test 1: Add a valid household and look it up")
+    try:
+        registry = HouseholdRegistry()
+        registry.add(Household("House", {"personA", "personB"},
+                               {Chore("wash up", 4), Chore("dusting", 1)}))
+        print("\n\tVALID: ", registry.exists("House"), registry.get("House").household_name)
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 2: Add a household with a name that is already used")
+    try:
+        registry = HouseholdRegistry()
+        registry.add(Household("House", {"personA", "personB"},
+                               {Chore("wash up", 4), Chore("dusting", 1)}))
+        registry.add(Household("House", {"personC", "personD"},
+                               {Chore("wash up", 4), Chore("dusting", 1)}))
+        print("\n\tVALID: ", len(registry))
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 3: Remove a household")
+    try:
+        registry = HouseholdRegistry()
+        registry.add(Household("House", {"personA", "personB"},
+                               {Chore("wash up", 4), Chore("dusting", 1)}))
+        registry.remove("House")
+        print("\n\tVALID: ", registry.exists("House"), len(registry))
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 4: Read households lazily, keeping at most 2")
+    try:
+        reads = []
+
+        def loader(household_name):
+            reads.append(household_name)
+            return Household(household_name, {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)})
+
+        registry = LazyHouseholdRegistry(capacity=2)
+        registry.index_households(["House", "Flat", "Loft"], loader)
+        registry.get("House")
+        registry.get("Flat")
+        registry.get("House")
+        registry.get("Loft")
+        registry.get("House")
+        registry.get("Flat")
+        print("\n\tVALID: ", len(registry), reads)
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 5: Keep the most used households, saving a changed household as it is let go")
+    try:
+        reads = []
+        saved = []
+        registry = LazyHouseholdRegistry(capacity=2, policy="lfu")
+        registry.index_households(["House", "Flat", "Loft"], loader, saved.extend)
+        registry.get("House")
+        registry.get("House")
+        registry.get("Flat").update_log("personA", "dusting", 1)
+        registry.get("Loft")
+        registry.get("House")
+        print("\n\tVALID: ", reads, [household.household_name for household in saved], registry.stats()[:5])
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 6: Measure a household again once its text has been made")
+    try:
+        registry = LazyHouseholdRegistry(capacity=None, capacity_bytes=10 ** 6)
+        registry.index_households(["House"], loader)
+        household = registry.get("House")
+        size = registry.stats().size
+        str(household)
+        print("\n\tVALID: ", registry.stats().size > size, registry.stats().size == sys.getsizeof(registry.get("House")))
+    except Exception as err:
+        print("\tERROR: ", err)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import contextlib
+import csv
+import io
+import json
+from collections import namedtuple
+
+from household_module import Household
+
+# A chore completion to be logged
+# line_number : the number of the line in the file the event was read from, starting at 1
+# household_name : the name of the household
+# name : the name of the participant
+# chore : the name of the chore
+# number_completed : the number of times the chore was done
+
+ChoreEvent = namedtuple("ChoreEvent", ["line_number", "household_name", "name", "chore", "number_completed"])
+
+# An event which could not be logged
+# line_number : the number of the line in the file, starting at 1
+# reason : a string explaining why the event was rejected
+
+Rejection = namedtuple("Rejection", ["line_number", "reason"])
+
+# The names of the columns of a CSV file, which may be given as its first line
+
+CSV_COLUMNS = ["household", "participant", "chore", "count"]
+
+
+# Reads chore events from a file. JSON lines files, with a .jsonl or .json extension, have an
+# object on each line with the keys "household", "participant", "chore" and "count". Any other
+# file is read as CSV with the columns household, participant, chore and count.
+# @param file_name, the name of the file including file extension
+# @return a tuple of a list of the ChoreEvents read and a list of Rejections for lines which
+#         could not be read
+#
+def read_events(file_name):
+    events = []
+    rejections = []
+    with open(file_name, newline="") as file:
+        if file_name.endswith((".jsonl", ".json")):
+            rows = read_json_lines(file)
+        else:
+            rows = read_csv_rows(file)
+        for line_number, row, error in rows:
+            if error is None and not str(row[3]).isdigit():
+                error = "The count should be a whole number."
+            if error is None:
+                events.append(ChoreEvent(line_number, row[0], row[1], row[2], int(row[3])))
+            else:
+                rejections.append(Rejection(line_number, error))
+    return events, rejections
+
+
+# Reads the rows of a CSV file, skipping blank lines and a header line.
+# @param file, an open file
+# @return a generator of tuples of the line number, a list of the row's elements, and an
+#         error message or None if the row could be read
+#
+def read_csv_rows(file):
+    for line_number, row in enumerate(csv.reader(file), 1):
+        if not row or (line_number == 1 and [column.strip().lower() for column in row] == CSV_COLUMNS):
+            continue
+        if len(row) != len(CSV_COLUMNS):
+            yield line_number, None, "There should be {} elements.".format(len(CSV_COLUMNS))
+        else:
+            yield line_number, row, None
+
+
+# Reads the objects of a JSON lines file, skipping blank lines.
+# @param file, an open file
+# @return a generator of tuples of the line number, a list of the object's values, and an
+#         error message or None if the object could be read
+#
+def read_json_lines(file):
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            event = json.loads(line)
+            row = [event[column] for column in CSV_COLUMNS]
+        except (ValueError, KeyError, TypeError):
+            yield line_number, None, "The line should be an object with the keys {}.".format(", ".join(CSV_COLUMNS))
+            continue
+        # The names are used as keys, so anything other than a string, such as a list, is rejected here
+        if not all(isinstance(value, str) for value in row[:3]):
+            yield line_number, None, "The household, participant and chore should be strings."
+        else:
+            yield line_number, row, None
+
+
+# Validates a batch of chore events and logs the valid ones, one household at a time.
+# An event is rejected if its household, participant or chore does not exist, if its
+# count is less than the minimum, or if it would take this week's total past the maximum
+# number of chores done in a week, counting the earlier events in the batch.
+# @param all_households, a HouseholdRegistry of household objects
+# @param events, an iterable of ChoreEvents
+# @return a tuple of the number of events logged and a list of Rejections in line order
+#
+def ingest_events(all_households, events):
+    rejections = []
+    # Groups the events by household so that each household is looked up once
+    events_by_household = {}
+    for event in events:
+        events_by_household.setdefault(event.household_name, []).append(event)
+    logged = 0
+    for household_name, household_events in events_by_household.items():
+        household = all_households.get(household_name)
+        if household is None:
+            rejections.extend(Rejection(event.line_number, "The household '{}' does not exist."
+                                        .format(household_name)) for event in household_events)
+            continue
+        # The household is locked so that no other writer changes the counts between
+        # checking the events and logging them
+        with household.lock:
+            log = household.chore_log
+            # This week's totals including the events accepted so far, keyed by participant and chore
+            totals = {}
+            accepted = []
+            for event in household_events:
+                if event.name not in log:
+                    rejections.append(Rejection(event.line_number, "The participant '{}' is not in the household."
+                                                .format(event.name)))
+                elif event.chore not in log[event.name]:
+                    rejections.append(Rejection(event.line_number, "The chore '{}' is not one of the household's chores."
+                                                .format(event.chore)))
+                elif event.number_completed < Household.MINIMUM_CHORES_DONE:
+                    rejections.append(Rejection(event.line_number, "The count must be at least {}."
+                                                .format(Household.MINIMUM_CHORES_DONE)))
+                else:
+                    key = (event.name, event.chore)
+                    total = totals.get(key, household.week_count(event.name, event.chore)) + event.number_completed
+                    if total > Household.MAXIMUM_CHORES_DONE:
+                        rejections.append(Rejection(event.line_number, "The number completed this week must be under {}."
+                                                    .format(Household.MAXIMUM_CHORES_DONE)))
+                    else:
+                        totals[key] = total
+                        accepted.append(event)
+            # The household's events are logged together, so a storage can save them in one go
+            household.update_logs([(event.name, event.chore, event.number_completed, None) for event in accepted])
+        logged = logged + len(accepted)
+    rejections.sort()
+    return logged, rejections
+
+
+# Reads a file of chore events, logs the valid ones, and prints a summary of the rejected lines.
+# @param all_households, a HouseholdRegistry of household objects
+# @param file_name, the name of the file including file extension
+# @return a tuple of the number of events logged and a list of Rejections in line order
+#
+def ingest_file(all_households, file_name):
+    try:
+        events, rejections = read_events(file_name)
+    except IOError:
+        # Print an error if the file can not be found
+        print("Error: '{}' file can not be found.".format(file_name))
+        return 0, []
+    except UnicodeDecodeError:
+        # Print an error if the file is not text
+        print("Error: '{}' file is not a text file.".format(file_name))
+        return 0, []
+    logged, ingest_rejections = ingest_events(all_households, events)
+    rejections = sorted(rejections + ingest_rejections)
+    print("\n\tLogged {} chore events from '{}'.".format(logged, file_name))
+    if rejections:
+        print("\t{} lines were rejected:".format(len(rejections)))
+        for rejection in rejections:
+            print("\t\tLine {}: {}".format(rejection.line_number, rejection.reason))
+    return logged, rejections
+
+
+# main method
+#
+# Contains some simple tests
+#
+def main():
+    import os
+    import tempfile
+    from chores_list_module import Chore
+    from household_registry_module import HouseholdRegistry
+
+    registry = HouseholdRegistry()
+    registry.add(Household("House", {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)}))
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("Test 1: Ingest a CSV file with a header and some invalid lines")
+        try:
+            file_name = os.path.join(directory, "events.csv")
+            with open(file_name, "w") as file:
+                file.write("household,participant,chore,count\nHouse,personA,wash up,3\nHouse,personC,wash up,1\n"
+                           "Flat,personA,wash up,1\nHouse,personB,dusting,x\nHouse,personB\n")
+            print("\n\tVALID: ", ingest_events(registry, read_events(file_name)[0])[0],
+                  [rejection.line_number for rejection in read_events(file_name)[1]])
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 2: Ingest a JSON lines file with names which are not strings")
+        try:
+            file_name = os.path.join(directory, "events.jsonl")
+            with open(file_name, "w") as file:
+                file.write('{"household": "House", "participant": "personB", "chore": "dusting", "count": 2}\n'
+                           '{"household": ["House"], "participant": "personB", "chore": "dusting", "count": 2}\n'
+                           '{"household": "House", "participant": {"name": "personB"}, "chore": "dusting", "count": 2}\n'
+                           '["House", "personB", "dusting", 2]\n')
+            with contextlib.redirect_stdout(io.StringIO()):
+                logged, rejections = ingest_file(registry, file_name)
+            print("\n\tVALID: ", logged, rejections)
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 3: Ingest events which take a total past the maximum")
+        try:
+            events = [ChoreEvent(1, "House", "personA", "wash up", 40), ChoreEvent(2, "House", "personA", "wash up", 40)]
+            print("\n\tVALID: ", ingest_events(registry, events), registry.get("House").chore_log["personA"])
+        except Exception as err:
+            print("\tERROR: ", err)
+
+
+        print("\nTest 4: Ingest a file which is not text")
+        try:
+            file_name = os.path.join(directory, "events.bin")
+            with open(file_name, "wb") as file:
+                file.write(b"House,personA,wash up,\xff\xfe\n")
+            print("\n\tVALID: ", ingest_file(registry, file_name))
+        except Exception as err:
+            print("\tERROR: ", err)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,489 @@
+import bisect
+import heapq
+import threading
+from collections import namedtuple
+
+from household_module import week_of
+
+# A participant's points on a leaderboard
+# points : the number of chores done, each multiplied by the chore's weight
+# household_name : the name of the participant's household
+# name : the participant's name
+
+Score = namedtuple("Score", ["points", "household_name", "name"])
+
+# A participant's line of a household's leaderboard, ready to be shown
+# score : the participant's Score
+# heading : the participant's place, name and points
+# chores : the lines listing the number of times the participant has done each chore
+
+LeaderboardEntry = namedtuple("LeaderboardEntry", ["score", "heading", "chores"])
+
+
+# Return the key leaderboards are sorted by: most points first, then by household
+# and participant name so that ties are always in the same order.
+#
+# @param score a Score
+# @return the sort key
+#
+def score_order(score):
+    return -score.points, score.household_name, score.name
+
+
+# Return the weight of each of a household's chores, in the order of its chore log's columns.
+#
+# @param household a Household object
+# @param weights a dictionary of chore name to weight, or None to weight each chore by its
+#        frequency. Chores missing from the dictionary have a weight of 1.
+# @return a list of the chore weights
+#
+def chore_weights(household, weights=None):
+    if weights is None:
+        frequencies = {chore.chore_name: int(chore.frequency) for chore in household.chores.chores}
+        return [frequencies[chore] for chore in household.chore_log.chore_names()]
+    return [weights.get(chore, 1) for chore in household.chore_log.chore_names()]
+
+
+# Work out the points of every participant in a household in one pass over its chore log,
+# or over the weeks kept by its history.
+#
+# @param household a Household object
+# @param weights a dictionary of chore name to weight, or None to weight each chore by its frequency
+# @param weeks the number of weeks up to this week to count, or None for all time
+# @param week the week number of the last week counted, defaults to this week
+# @return a list of Score tuples, in the same order as iterating the chore log
+#
+def score_household(household, weights=None, weeks=None, week=None):
+    log = household.chore_log
+    if weeks is None:
+        totals = log.weighted_totals(chore_weights(household, weights))
+    else:
+        totals = household.history.weighted_totals(chore_weights(household, weights), weeks, week)
+    return [Score(points, household.household_name, name) for name, points in zip(log, totals)]
+
+
+# Sort scores into leaderboard order.
+#
+# @param scores an iterable of Score tuples
+# @return a list of Score tuples with the most points first
+#
+def rank_scores(scores):
+    return sorted(scores, key=score_order)
+
+
+# Return a household's leaderboard with the text of each participant's entry, weighting each
+# chore by its frequency. It is kept by the household until the household changes, so showing
+# the same household again does not work it out again.
+#
+# @param household a Household object
+# @param weeks the number of weeks up to this week to count, or None for all time
+# @return a tuple of LeaderboardEntry tuples with the most points first, which must not be changed
+#
+def leaderboard_entries(household, weeks=None):
+    if weeks is None:
+        return household.rendered("leaderboard", make_leaderboard_entries)
+    # The week is part of the key, so a weekly leaderboard is made again when the week changes
+    week = week_of()
+    return household.rendered("leaderboard {} {}".format(weeks, week),
+                              lambda household: make_leaderboard_entries(household, weeks, week))
+
+
+# Work out a household's leaderboard with the text of each participant's entry.
+#
+# @param household a Household object
+# @param weeks the number of weeks up to this week to count, or None for all time
+# @param week the week number of the last week counted, defaults to this week
+# @return a tuple of LeaderboardEntry tuples with the most points first
+#
+def make_leaderboard_entries(household, weeks=None, week=None):
+    log = household.chore_log
+    if weeks is None:
+        counts = {name: log[name].items() for name in log}
+    else:
+        counts = {name: [(chore, household.history.total(name, chore, weeks, week)) for chore in log[name]]
+                  for name in log}
+    return tuple(LeaderboardEntry(score, "\t{}. {} ({} points):".format(place, score.name, score.points),
+                                  "\n".join(["\t\t{} ({})".format(chore, count)
+                                             for chore, count in counts[score.name]]))
+                 for place, score in enumerate(rank_scores(score_household(household, None, weeks, week)), 1))
+
+
+# Work out the leaderboard of every household and the leaderboard across all households.
+#
+# @param all_households a HouseholdRegistry of household objects
+# @param weights a dictionary of chore name to weight, or None to weight each chore by its frequency
+# @return a tuple of a dictionary of each household's ranked list of Scores, keyed by household name,
+#         and a ranked list of the Scores of every participant in every household
+#
+def score_households(all_households, weights=None):
+    household_boards = {}
+    all_scores = []
+    for household in all_households:
+        scores = score_household(household, weights)
+        household_boards[household.household_name] = rank_scores(scores)
+        all_scores.extend(scores)
+    return household_boards, rank_scores(all_scores)
+
+
+# Find the participants with the most points across all households, without sorting
+# every participant.
+#
+# @param all_households a HouseholdRegistry of household objects
+# @param number the number of participants to return
+# @param weights a dictionary of chore name to weight, or None to weight each chore by its frequency
+# @param weeks the number of weeks up to this week to count, or None for all time
+# @return a ranked list of the top Scores
+#
+def top_housemates(all_households, number=10, weights=None, weeks=None):
+    week = week_of()
+    scores = (score for household in all_households for score in score_household(household, weights, weeks, week))
+    return heapq.nsmallest(number, scores, key=score_order)
+
+
+class SortedList:
+    # The most keys kept in one bucket before it is split in two
+    BUCKET_SIZE = 1000
+
+    # Constructor for the SortedList class. The keys are kept in order in a list of buckets,
+    # each a sorted list of up to BUCKET_SIZE keys, along with the last key of each bucket.
+    # A key is found by a binary search of the last keys and then of one bucket, and adding
+    # or removing a key only moves the keys of one bucket, however many keys there are.
+    # The lengths of the buckets are kept in a Fenwick tree, so the number of keys before a
+    # bucket is found without adding up the lengths of every bucket before it.
+    #
+    # @param keys an optional iterable of keys
+    #
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self._buckets = [keys[start:start + SortedList.BUCKET_SIZE]
+                         for start in range(0, len(keys), SortedList.BUCKET_SIZE)]
+        self._maximums = [bucket[-1] for bucket in self._buckets]
+        self._length = len(keys)
+        self._build_tree()
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            yield from bucket
+
+    # Add a key in its place.
+    #
+    # @param key the key to add
+    #
+    def add(self, key):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maximums.append(key)
+            self._build_tree()
+        else:
+            position = min(bisect.bisect_left(self._maximums, key), len(self._buckets) - 1)
+            bucket = self._buckets[position]
+            bisect.insort(bucket, key)
+            self._maximums[position] = bucket[-1]
+            if len(bucket) > 2 * SortedList.BUCKET_SIZE:
+                self._buckets.insert(position + 1, bucket[SortedList.BUCKET_SIZE:])
+                del bucket[SortedList.BUCKET_SIZE:]
+                self._maximums.insert(position, bucket[-1])
+                # The buckets after the split have moved, which only happens once every BUCKET_SIZE keys
+                self._build_tree()
+            else:
+                self._add_length(position, 1)
+        self._length = self._length + 1
+
+    # Remove a key.
+    #
+    # @param key the key to remove
+    # @exception ValueError raised if the key is not in the list
+    #
+    def remove(self, key):
+        position = bisect.bisect_left(self._maximums, key)
+        if position == len(self._buckets):
+            raise ValueError("The key is not in the list.")
+        bucket = self._buckets[position]
+        index = bisect.bisect_left(bucket, key)
+        if index == len(bucket) or bucket[index] != key:
+            raise ValueError("The key is not in the list.")
+        del bucket[index]
+        if bucket:
+            self._maximums[position] = bucket[-1]
+            self._add_length(position, -1)
+        else:
+            del self._buckets[position]
+            del self._maximums[position]
+            self._build_tree()
+        self._length = self._length - 1
+
+    # Return the number of keys before a key, which is the key's position if it is in the list.
+    #
+    # @param key the key to look for
+    # @return the number of keys less than the key
+    #
+    def index(self, key):
+        position = bisect.bisect_left(self._maximums, key)
+        if position == len(self._buckets):
+            return self._length
+        return self._keys_before(position) + bisect.bisect_left(self._buckets[position], key)
+
+    # Return the keys from one position up to but not including another.
+    #
+    # @param start the position of the first key
+    # @param stop the position after the last key
+    # @return a list of the keys
+    #
+    def slice(self, start, stop):
+        keys = []
+        # Starts from the bucket holding the first key, found through the Fenwick tree
+        position, before = self._bucket_at(max(start, 0))
+        start = start - before
+        stop = stop - before
+        for bucket in self._buckets[position:]:
+            if stop <= 0:
+                break
+            if start < len(bucket):
+                keys.extend(bucket[max(start, 0):stop])
+            start = start - len(bucket)
+            stop = stop - len(bucket)
+        return keys
+
+    # Make the Fenwick tree of the buckets' lengths again, after buckets have been added or removed.
+    # Entry i of the tree, counting from 1, holds the total length of the buckets from
+    # i - (i & -i) up to but not including i.
+    #
+    def _build_tree(self):
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] = tree[parent] + tree[i]
+        self._tree = tree
+
+    # Change the length of a bucket in the Fenwick tree.
+    #
+    def _add_length(self, position, change):
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] = self._tree[i] + change
+            i = i + (i & -i)
+
+    # Return the number of keys in the buckets before a bucket.
+    #
+    def _keys_before(self, position):
+        total = 0
+        i = position
+        while i > 0:
+            total = total + self._tree[i]
+            i = i - (i & -i)
+        return total
+
+    # Return the position of the bucket holding the key at a position, and the number of keys
+    # in the buckets before it, by walking down the Fenwick tree.
+    #
+    def _bucket_at(self, index):
+        position = 0
+        before = 0
+        step = 1 << (len(self._tree).bit_length() - 1)
+        while step:
+            following = position + step
+            if following < len(self._tree) and before + self._tree[following] <= index:
+                position = following
+                before = before + self._tree[following]
+            step = step >> 1
+        return position, before
+
+
+class Leaderboard:
+
+    # Constructor for the Leaderboard class. The leaderboard keeps every participant of every
+    # household it has been given in a SortedList in leaderboard order, so it is kept up to
+    # date as chores are logged instead of being worked out again from every chore log.
+    # It can be updated by households from different threads at once.
+    #
+    # @param weights a dictionary of chore name to weight, or None to weight each chore by its frequency
+    #
+    def __init__(self, weights=None):
+        self.weights = weights
+        self._keys = SortedList()  # Sorted (-points, household name, name) keys
+        self._points = {}  # Points keyed by (household name, name)
+        # Held while the leaderboard is read or changed, as households updated from
+        # different threads share the leaderboard
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    # Add every participant of every household to the leaderboard.
+    #
+    # @param all_households an iterable of Household objects
+    #
+    def add_households(self, all_households):
+        with self._lock:
+            keys = list(self._keys)
+            for household in all_households:
+                for score in score_household(household, self.weights):
+                    if (score.household_name, score.name) not in self._points:
+                        self._points[(score.household_name, score.name)] = score.points
+                        keys.append((-score.points, score.household_name, score.name))
+            self._keys = SortedList(keys)
+
+    # Add every participant of a household to the leaderboard.
+    #
+    # @param household a Household object
+    #
+    def add_household(self, household):
+        with self._lock:
+            for score in score_household(household, self.weights):
+                self._move(score.household_name, score.name, score.points)
+
+    # Called by the registry whenever a household is added to it. Adds the household's
+    # participants, so that a new household has a place before any chores are logged.
+    #
+    # @param household a Household object
+    #
+    def household_added(self, household):
+        self.add_household(household)
+
+    # Called by the registry whenever a household is removed from it.
+    #
+    # @param household a Household object
+    #
+    def household_removed(self, household):
+        self.remove_household(household)
+
+    # Remove every participant of a household from the leaderboard.
+    #
+    # @param household a Household object
+    #
+    def remove_household(self, household):
+        with self._lock:
+            for name in household.chore_log:
+                points = self._points.pop((household.household_name, name), None)
+                if points is not None:
+                    self._keys.remove((-points, household.household_name, name))
+
+    # Called by a household whenever its chore log is updated. Moves the participant to their
+    # new place on the leaderboard.
+    #
+    # @param household the Household object that was updated
+    # @param name a string containing the name of the participant
+    # @param chore a string containing the name of the chore
+    # @param number_completed the number added on to the existing total
+    # @param timestamp the time the chores were done in seconds since the epoch
+    #
+    def chore_logged(self, household, name, chore, number_completed, timestamp):
+        with self._lock:
+            points = self._points.get((household.household_name, name))
+            if points is None:
+                # The household is new to the leaderboard, and its scores already include the update
+                self.add_household(household)
+            else:
+                points = points + number_completed * self.chore_weight(household, chore)
+                self._move(household.household_name, name, points)
+
+    # Return the weight of one of a household's chores.
+    #
+    # @param household a Household object
+    # @param chore the name of the chore
+    # @return the weight of the chore
+    #
+    def chore_weight(self, household, chore):
+        if self.weights is not None:
+            return self.weights.get(chore, 1)
+        chore_obj = household.chores.get(chore)
+        return 1 if chore_obj is None else int(chore_obj.frequency)
+
+    # Return the participants with the most points.
+    #
+    # @param number the number of participants to return
+    # @return a ranked list of Scores
+    #
+    def top(self, number=10):
+        with self._lock:
+            return [Score(-key[0], key[1], key[2]) for key in self._keys.slice(0, number)]
+
+    # Return a participant's place on the leaderboard, where 1 is the most points.
+    #
+    # @param household_name the name of the participant's household
+    # @param name the participant's name
+    # @return the place, or None if the participant is not on the leaderboard
+    #
+    def rank_of(self, household_name, name):
+        with self._lock:
+            points = self._points.get((household_name, name))
+            if points is None:
+                return None
+            return self._keys.index((-points, household_name, name)) + 1
+
+    # Return the participants either side of a participant on the leaderboard, including the participant.
+    #
+    # @param household_name the name of the participant's household
+    # @param name the participant's name
+    # @param number the number of participants to return above and below
+    # @return a ranked list of Scores, or an empty list if the participant is not on the leaderboard
+    #
+    def neighbours_of(self, household_name, name, number=2):
+        with self._lock:
+            rank = self.rank_of(household_name, name)
+            if rank is None:
+                return []
+            start = max(rank - 1 - number, 0)
+            return [Score(-key[0], key[1], key[2]) for key in self._keys.slice(start, rank + number)]
+
+    # Give a participant a new number of points, moving them to their new place.
+    #
+    def _move(self, household_name, name, points):
+        old_points = self._points.get((household_name, name))
+        if old_points is not None:
+            self._keys.remove((-old_points, household_name, name))
+        self._points[(household_name, name)] = points
+        self._keys.add((-points, household_name, name))
+
+
+# main method
+#
+# Contains some simple tests
+#
+def main():
+    from household_module import Household
+    from chores_list_module import Chore
+    from household_registry_module import HouseholdRegistry
+
+    print("Test 1: Add and remove keys from a SortedList split over several buckets")
+    try:
+        bucket_size = SortedList.BUCKET_SIZE
+        SortedList.BUCKET_SIZE = 4
+        keys = SortedList(range(0, 40, 2))
+        for key in range(1, 40, 4):
+            keys.add(key)
+        keys.remove(0)
+        keys.remove(38)
+        print("\n\tVALID: ", len(keys), keys.index(21), keys.slice(8, 12), list(keys) == sorted(keys))
+    except Exception as err:
+        print("\tERROR: ", err)
+    SortedList.BUCKET_SIZE = bucket_size
+
+    print("\nTest 2: Remove a key which is not in the SortedList")
+    try:
+        keys.remove(3)
+        print("\n\tVALID: ", len(keys))
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 3: Place a household added to the registry before any chores are logged")
+    try:
+        registry = HouseholdRegistry()
+        registry.add(Household("House", {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)}))
+        leaderboard = Leaderboard()
+        leaderboard.add_households(registry)
+        registry.add_listener(leaderboard)
+        registry.get("House").update_log("personA", "wash up", 2)
+        registry.add(Household("Flat", {"personC", "personD"}, {Chore("wash up", 4), Chore("dusting", 1)}))
+        print("\n\tVALID: ", len(leaderboard), leaderboard.rank_of("House", "personA"),
+              leaderboard.rank_of("Flat", "personC"), leaderboard.top(1))
+    except Exception as err:
+        print("\tERROR: ", err)
+
+
+if __name__ == "__main__":
+    main()
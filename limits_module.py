@@ -0,0 +1,120 @@
+import json
+from collections import namedtuple
+
+from household_module import Household
+from chores_list_module import ChoresList, Chore
+from participants_list_module import Participants
+
+# The limits the households are validated against
+# minimum_household_size : the fewest participants in a household
+# maximum_household_size : the most participants in a household
+# minimum_number_of_chores : the fewest chores in a household
+# maximum_number_of_chores : the most chores in a household
+# maximum_chore_frequency : the most times a week a chore can need doing
+# maximum_chores_done : the most times a participant can do a chore in one week
+
+Limits = namedtuple("Limits", ["minimum_household_size", "maximum_household_size",
+                               "minimum_number_of_chores", "maximum_number_of_chores",
+                               "maximum_chore_frequency", "maximum_chores_done"])
+
+# The named sets of limits. "standard" is a shared house, and "large" is a student
+# hall or co-op with hundreds of members, dozens of chores and counts in the thousands.
+
+PROFILES = {
+    "standard": Limits(2, 5, 2, 5, 20, 50),
+    "large": Limits(2, 1000, 2, 100, 100, 100000),
+}
+
+
+# Return the limits the households are being validated against.
+#
+# @return a Limits tuple
+#
+def current_limits():
+    return Limits(Participants.MINIMUM_HOUSEHOLD_SIZE, Participants.MAXIMUM_HOUSEHOLD_SIZE,
+                  ChoresList.MINIMUM_NUMBER_OF_CHORES, ChoresList.MAXIMUM_NUMBER_OF_CHORES,
+                  Chore.MAXIMUM_CHORE_FREQUENCY, Household.MAXIMUM_CHORES_DONE)
+
+
+# Validate the households against a set of limits from now on. This should be done once
+# when the program starts, before any households are read.
+#
+# @param limits a Limits tuple
+#
+def apply_limits(limits):
+    Participants.MINIMUM_HOUSEHOLD_SIZE = limits.minimum_household_size
+    Participants.MAXIMUM_HOUSEHOLD_SIZE = limits.maximum_household_size
+    ChoresList.MINIMUM_NUMBER_OF_CHORES = limits.minimum_number_of_chores
+    ChoresList.MAXIMUM_NUMBER_OF_CHORES = limits.maximum_number_of_chores
+    Chore.MAXIMUM_CHORE_FREQUENCY = limits.maximum_chore_frequency
+    Household.MAXIMUM_CHORES_DONE = limits.maximum_chores_done
+
+
+# Read a set of limits, either by the name of a profile or from a JSON file. The file
+# holds an object which may name the "profile" it starts from, which defaults to
+# "standard", and give any of the Limits fields to change.
+#
+# @param profile the name of a profile in PROFILES, or the name of a JSON file
+# @return a Limits tuple
+# @exception ValueError raised if the file is not valid
+# @exception IOError raised if the profile is not known and the file can not be read
+#
+def load_limits(profile):
+    if profile in PROFILES:
+        return PROFILES[profile]
+    with open(profile) as file:
+        settings = json.load(file)
+    if not isinstance(settings, dict):
+        raise ValueError("The limits file should hold an object.")
+    base = settings.pop("profile", "standard")
+    if base not in PROFILES:
+        raise ValueError("The profile '{}' is not one of {}.".format(base, ", ".join(PROFILES)))
+    for field, value in settings.items():
+        if field not in Limits._fields:
+            raise ValueError("'{}' is not a limit. The limits are {}.".format(field, ", ".join(Limits._fields)))
+        if not isinstance(value, int) or value < 1:
+            raise ValueError("The limit '{}' should be a whole number more than 0.".format(field))
+    limits = PROFILES[base]._replace(**settings)
+    if limits.minimum_household_size > limits.maximum_household_size or \
+            limits.minimum_number_of_chores > limits.maximum_number_of_chores:
+        raise ValueError("The minimum limits should not be more than the maximum limits.")
+    return limits
+
+
+# main method
+#
+# Contains some simple tests
+#
+def main():
+    standard = current_limits()
+
+    print("Test 1: Apply the large profile and create a household of 500 participants")
+    try:
+        apply_limits(load_limits("large"))
+        names = set()
+        for number in range(500):
+            names.add("person" + chr(ord("a") + number // 26 // 26 % 26) + chr(ord("a") + number // 26 % 26) +
+                      chr(ord("a") + number % 26))
+        household = Household("Hall", names, {Chore("wash up", 4), Chore("dusting", 1)})
+        household.update_log("personaaa", "wash up", 1000)
+        print("\n\tVALID: ", len(household.participants), household.chore_log["personaaa"]["wash up"])
+    except Exception as err:
+        print("\tERROR: ", err)
+    apply_limits(standard)
+
+    print("\nTest 2: Create a household of 500 participants with the standard profile")
+    try:
+        household = Household("Hall", names, {Chore("wash up", 4), Chore("dusting", 1)})
+        print("\n\tVALID: ", len(household.participants))
+    except Exception as err:
+        print("\tERROR: ", err)
+
+    print("\nTest 3: Load limits that are not known")
+    try:
+        print("\n\tVALID: ", load_limits("huge"))
+    except Exception as err:
+        print("\tERROR: ", err)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
+import sys
+
+
 class Participants:
+    # Instances have no __dict__, so each one only takes the memory of its attributes
+    __slots__ = ("_names", "_positions")
+
     # Constants used for validation
     MINIMUM_NAME_LENGTH = 3  # Used to validate team member's name
     MAXIMUM_NAME_LENGTH = 10
@@ -7,16 +13,30 @@ class Participants:
     MAXIMUM_HOUSEHOLD_SIZE = 5
 
     # Constructor for the set containing participant's names.
-    # @param the_participants a set containing the names
+    # @param the_participants a set containing the names, or a list of them to keep them in that order
     #              
     def __init__(self, the_participants):
         self.participants = the_participants
 
-    # Return the participants' list.
+    # Create a Participants object from names which have already been validated, such as
+    # those read from a checked line of the households file, without checking them again.
+    # The interactive and API input must use the constructor instead.
+    #
+    # @param the_participants a valid set of names, or a list of them to keep them in that order
+    # @return a Participants object
+    #
+    @classmethod
+    def from_validated(cls, the_participants):
+        participants = cls.__new__(cls)
+        participants._set_names(the_participants)
+        return participants
+
+    # Return the participants' names, which can be used like a set and are in the order
+    # they were given in.
     #          
     @property
     def participants(self):
-        return self._participants
+        return self._positions.keys()
 
     # Sets the participants' list attribute.
     #  @param name the participants set
@@ -27,10 +47,48 @@ class Participants:
     def participants(self, the_participants):
         try:
             self.valid_participants(the_participants)
-            self._participants = the_participants
+            self._set_names(the_participants)
         except (ValueError, TypeError) as err:
             raise
 
+    def __len__(self):
+        return len(self._names)
+
+    # Return the name of a participant from their number, which is their position
+    # counting from 1 in the order the names are shown.
+    #
+    # @param number the participant's number
+    # @return the participant's name
+    # @exception IndexError raised if there is no participant with the number
+    #
+    def participant_at(self, number):
+        if number < 1:
+            raise IndexError("There is no participant number {}.".format(number))
+        return self._names[number - 1]
+
+    # Return the number of a participant, which is their position counting from 1 in
+    # the order the names are shown.
+    #
+    # @param name the participant's name
+    # @return the participant's number
+    # @exception KeyError raised if there is no participant with the name
+    #
+    def participant_number(self, name):
+        return self._positions[name] + 1
+
+    # Return the memory used by the participants in bytes, not counting the names, which are
+    # shared by every household. Used by sys.getsizeof.
+    #
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self._names) + sys.getsizeof(self._positions)
+
+    # Keep the names in order along with a dictionary of each name's position.
+    #
+    def _set_names(self, the_participants):
+        # The same name is shared by every household instead of each having a copy
+        self._names = tuple(sys.intern(name) for name in the_participants)
+        self._positions = {name: position for position, name in enumerate(self._names)}
+
     def __str__(self):
         length = len(self.participants)
         count = 1
@@ -46,19 +104,22 @@ class Participants:
     # Check the set of participants.
     # Verifies that the set of participants is a valid length.
     # Verifies that each participants is valid.
+    # Verifies that a list of participants has no name more than once.
     # 
-    # @param the_participants the set of participants to be validated
+    # @param the_participants the set, or list, of participants to be validated
     # @return True if the set conforms to the validation conditions
     #         and raise exception if it does not.
     #
     @staticmethod
     def valid_participants(the_participants):
-        if not isinstance(the_participants, set):
-            raise TypeError("List of participants is not a set.")
+        if not isinstance(the_participants, (set, list, tuple)):
+            raise TypeError("List of participants is not a set or a list.")
         try:
             for name in the_participants:
                 Participants.is_valid_name(name)
             Participants.is_valid_length(the_participants)
+            if len(set(the_participants)) < len(the_participants):
+                raise ValueError("The participants' names must all be different.")
         except ValueError as err:
             raise
 
@@ -108,10 +169,9 @@ def main():
     except Exception as err:
         print("\tERROR: ", err)
 
-    print("\nTest 2: Create a set of participants with the wrong data type: list")
+    print("\nTest 2: Create a set of participants with the wrong data type: string")
     try:
-        names = ["personA", "personB", "personC"]
-        p2 = Participants(names)
+        p2 = Participants("personA")
         print("\tVALID: ", p2)
     except Exception as err:
         print("\tERROR: ", err)
@@ -149,5 +209,12 @@ def main():
         print("\tERROR: ", err)
 
 
+    print("\nTest 7: Create participants from a list, keeping them in order, then from a list with a name twice")
+    try:
+        print("\tVALID: ", Participants(["personC", "personA", "personB"]))
+        print("\tVALID: ", Participants(["personC", "personA", "personC"]))
+    except Exception as err:
+        print("\tERROR: ", err)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,382 @@
+import sqlite3
+
+from household_module import Household, ChoreHistory, week_of
+from chores_list_module import Chore
+from household_registry_module import LazyHouseholdRegistry
+
+# The tables used to store the households. Every lookup used by the storage goes
+# through a primary key or a unique index.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS households (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS participants (
+    id INTEGER PRIMARY KEY,
+    household_id INTEGER NOT NULL REFERENCES households (id),
+    name TEXT NOT NULL,
+    UNIQUE (household_id, name)
+);
+CREATE TABLE IF NOT EXISTS chores (
+    id INTEGER PRIMARY KEY,
+    household_id INTEGER NOT NULL REFERENCES households (id),
+    name TEXT NOT NULL,
+    frequency INTEGER NOT NULL,
+    UNIQUE (household_id, name)
+);
+CREATE TABLE IF NOT EXISTS chore_counts (
+    participant_id INTEGER NOT NULL REFERENCES participants (id),
+    chore_id INTEGER NOT NULL REFERENCES chores (id),
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (participant_id, chore_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS chore_weeks (
+    participant_id INTEGER NOT NULL REFERENCES participants (id),
+    chore_id INTEGER NOT NULL REFERENCES chores (id),
+    week INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (participant_id, chore_id, week)
+) WITHOUT ROWID;
+"""
+
+# Reads the counts of a household's chores in each week, either for every household or,
+# with a household name added to the query, for one household
+
+WEEKS_QUERY = """
+SELECT households.name, participants.name, chores.name, chore_weeks.week, chore_weeks.count
+FROM chore_weeks
+JOIN participants ON participants.id = chore_weeks.participant_id
+JOIN chores ON chores.id = chore_weeks.chore_id
+JOIN households ON households.id = participants.household_id
+WHERE chore_weeks.week > ?
+"""
+
+# Finds the count for a participant and chore of a household by name
+
+COUNT_WHERE = """
+WHERE participant_id = (SELECT participants.id FROM participants
+                        JOIN households ON households.id = participants.household_id
+                        WHERE households.name = ? AND participants.name = ?)
+  AND chore_id = (SELECT chores.id FROM chores
+                  JOIN households ON households.id = chores.household_id
+                  WHERE households.name = ? AND chores.name = ?)
+"""
+
+
+class SQLiteStorage:
+
+    # Constructor for the SQLiteStorage class. Stores the households and chore logs in an
+    # SQLite database, which is created if it does not exist. Every chore logged updates
+    # a single count in the database as it happens.
+    #
+    # @param database_file the name of the database file, or ":memory:"
+    #
+    def __init__(self, database_file="chore_chart.db"):
+        self.database_file = database_file
+        self._connection = sqlite3.connect(database_file)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        self._connection.executescript(SCHEMA)
+
+    # Read every household and its chore log into a registry, and update the database
+    # whenever a chore is logged from then on.
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    #
+    def load(self, all_households):
+        if isinstance(all_households, LazyHouseholdRegistry):
+            # Only the names are read, and each household is read when it is first needed
+            all_households.index_households([name for (name,) in self._connection.execute(
+                "SELECT name FROM households ORDER BY id")], self.load_household, self.write_back)
+        else:
+            self.read_households(all_households)
+            self.read_chore_log(all_households)
+        all_households.add_listener(self)
+        all_households.mark_clean()
+
+    # Write any households that have not been saved. The chore logs have already been
+    # written as the chores were logged.
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    #
+    def save(self, all_households):
+        self.write_households(all_households)
+        all_households.mark_clean()
+
+    # Close the database.
+    #
+    def close(self):
+        self._connection.close()
+
+    # Called by a household whenever its chore log is updated. Adds the number completed
+    # to the single count for the participant and chore.
+    #
+    # @param household the Household object that was updated
+    # @param name a string containing the name of the participant
+    # @param chore a string containing the name of the chore
+    # @param number_completed the number added on to the existing total
+    # @param timestamp the time the chores were done in seconds since the epoch
+    #
+    def chore_logged(self, household, name, chore, number_completed, timestamp):
+        self.chores_logged(household, [(name, chore, number_completed, timestamp)])
+
+    # Called by a household when several updates are made to its chore log at once. Adds
+    # every update to the counts in a single transaction.
+    #
+    # @param household the Household object that was updated
+    # @param updates a list of (name, chore, number_completed, timestamp) tuples
+    #
+    def chores_logged(self, household, updates):
+        with self._connection:
+            for name, chore, number_completed, timestamp in updates:
+                cursor = self._connection.execute("UPDATE chore_counts SET count = count + ?" + COUNT_WHERE,
+                                                  (int(number_completed), household.household_name, name,
+                                                   household.household_name, chore))
+                # A household created since the last save is inserted along with its whole chore
+                # log, which already includes every one of the updates
+                if cursor.rowcount == 0 and self.add_household(household):
+                    self.write_household_log(household)
+                    break
+                self._connection.execute(
+                    "INSERT INTO chore_weeks (participant_id, chore_id, week, count) "
+                    "SELECT participant_id, chore_id, ?, ? FROM chore_counts" + COUNT_WHERE +
+                    "ON CONFLICT (participant_id, chore_id, week) DO UPDATE SET count = count + excluded.count",
+                    (week_of(timestamp), int(number_completed), household.household_name, name,
+                     household.household_name, chore))
+
+    # Return the number of times a participant has done a chore.
+    #
+    # @param household_name the name of the household
+    # @param name the name of the participant
+    # @param chore the name of the chore
+    # @return the number of times the chore has been done, or None if there is no such count.
+    #
+    def get_count(self, household_name, name, chore):
+        row = self._connection.execute("SELECT count FROM chore_counts" + COUNT_WHERE,
+                                       (household_name, name, household_name, chore)).fetchone()
+        return None if row is None else row[0]
+
+    # Return the household with the given name, including its chore log, reading only
+    # the rows for that household.
+    #
+    # @param household_name the name of the household
+    # @return the Household object, or None if it does not exist.
+    #
+    def get_household(self, household_name):
+        row = self._connection.execute("SELECT id FROM households WHERE name = ?",
+                                       (household_name,)).fetchone()
+        if row is None:
+            return None
+        participants = [name for (name,) in self._connection.execute(
+            "SELECT name FROM participants WHERE household_id = ? ORDER BY id", row)]
+        chores = self._connection.execute(
+            "SELECT name, frequency FROM chores WHERE household_id = ? ORDER BY id", row).fetchall()
+        household = Household(household_name, participants,
+                              [Chore(name, frequency) for name, frequency in chores])
+        for name, chore, count in self._connection.execute(
+                "SELECT participants.name, chores.name, chore_counts.count FROM chore_counts "
+                "JOIN participants ON participants.id = chore_counts.participant_id "
+                "JOIN chores ON chores.id = chore_counts.chore_id "
+                "WHERE participants.household_id = ? AND chore_counts.count > 0", row):
+            household.add_total(name, chore, count)
+        for household_name, name, chore, week, count in self._connection.execute(
+                WEEKS_QUERY + "AND households.name = ?", (week_of() - ChoreHistory.WEEKS, household_name)):
+            household.history.add(name, chore, count, week)
+        return household
+
+    # Read a household for a LazyHouseholdRegistry. A household which is no longer valid
+    # is omitted with an error message.
+    #
+    # @param household_name the name of the household
+    # @return the Household object, or None if it does not exist or is not valid.
+    #
+    def load_household(self, household_name):
+        try:
+            household = self.get_household(household_name)
+        except (TypeError, ValueError) as err:
+            print("\nError in household '{}' of the database (This household will be omitted):\n\t"
+                  .format(household_name), err)
+            return None
+        if household is not None:
+            household.dirty = False
+        return household
+
+    # Read every household from the database into a registry. Households which are
+    # no longer valid are omitted with an error message.
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    #
+    def read_households(self, all_households):
+        participants = {}
+        for household_id, name in self._connection.execute(
+                "SELECT household_id, name FROM participants ORDER BY id"):
+            participants.setdefault(household_id, []).append(name)
+        chores = {}
+        for household_id, name, frequency in self._connection.execute(
+                "SELECT household_id, name, frequency FROM chores ORDER BY id"):
+            chores.setdefault(household_id, []).append((name, frequency))
+        for household_id, household_name in self._connection.execute(
+                "SELECT id, name FROM households ORDER BY id"):
+            try:
+                all_households.add(Household(
+                    household_name, participants.get(household_id, []),
+                    [Chore(name, frequency) for name, frequency in chores.get(household_id, [])]))
+            except (TypeError, ValueError) as err:
+                print("\nError in household '{}' of the database (This household will be omitted):\n\t"
+                      .format(household_name), err)
+
+    # Insert the changed households which are not already in the database, with a count
+    # of zero for every participant and chore.
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    #
+    def write_households(self, all_households):
+        self.write_back(all_households.dirty_households())
+
+    # Insert changed households which are not already in the database. The chore logs have
+    # already been written as the chores were logged.
+    #
+    # @param households a list of the changed Household objects
+    #
+    def write_back(self, households):
+        with self._connection:
+            for household in households:
+                self.add_household(household)
+
+    # Insert a household into the database if it is not already there.
+    #
+    # @param household a Household object
+    # @return True if the household was inserted, False if it was already in the database.
+    #
+    def add_household(self, household):
+        cursor = self._connection.execute("INSERT OR IGNORE INTO households (name) VALUES (?)",
+                                          (household.household_name,))
+        if cursor.rowcount == 0:
+            return False
+        household_id = cursor.lastrowid
+        participant_ids = []
+        for name in household.participants.participants:
+            participant_ids.append(self._connection.execute(
+                "INSERT INTO participants (household_id, name) VALUES (?, ?)",
+                (household_id, name)).lastrowid)
+        for chore in household.chores.chores:
+            chore_id = self._connection.execute(
+                "INSERT INTO chores (household_id, name, frequency) VALUES (?, ?, ?)",
+                (household_id, chore.chore_name, int(chore.frequency))).lastrowid
+            self._connection.executemany(
+                "INSERT INTO chore_counts (participant_id, chore_id, count) VALUES (?, ?, 0)",
+                [(participant_id, chore_id) for participant_id in participant_ids])
+        return True
+
+    # Read the chore counts from the database into the households of a registry.
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    #
+    def read_chore_log(self, all_households):
+        for household_name, name, chore, count in self._connection.execute(
+                "SELECT households.name, participants.name, chores.name, chore_counts.count "
+                "FROM chore_counts "
+                "JOIN participants ON participants.id = chore_counts.participant_id "
+                "JOIN chores ON chores.id = chore_counts.chore_id "
+                "JOIN households ON households.id = participants.household_id "
+                "WHERE chore_counts.count > 0"):
+            household = all_households.get(household_name)
+            if household is not None:
+                household.add_total(name, chore, count)
+        for household_name, name, chore, week, count in self._connection.execute(
+                WEEKS_QUERY, (week_of() - ChoreHistory.WEEKS,)):
+            household = all_households.get(household_name)
+            if household is not None:
+                household.history.add(name, chore, count, week)
+
+    # Write every count of the changed households' chore logs to the database.
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    #
+    def write_chore_log(self, all_households):
+        with self._connection:
+            for household in all_households.dirty_households():
+                self.add_household(household)
+                self.write_household_log(household)
+
+    # Write every count of a household's chore log, and its counts for each week, to the database.
+    #
+    # @param household a Household object which is in the database
+    #
+    def write_household_log(self, household):
+        log = household.chore_log
+        for name in log:
+            for chore in log[name]:
+                self._connection.execute("UPDATE chore_counts SET count = ?" + COUNT_WHERE,
+                                         (log[name][chore], household.household_name, name,
+                                          household.household_name, chore))
+        for week, name, chore, count in household.history.records():
+            self._connection.execute(
+                "INSERT OR REPLACE INTO chore_weeks (participant_id, chore_id, week, count) "
+                "SELECT participant_id, chore_id, ?, ? FROM chore_counts" + COUNT_WHERE,
+                (week, count, household.household_name, name, household.household_name, chore))
+
+
+# main method
+#
+# Contains some simple tests
+#
+def main():
+    import os
+    import tempfile
+    from household_registry_module import HouseholdRegistry
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_file = os.path.join(directory, "chore_chart.db")
+
+        print("Test 1: Save two households, log some chores and load them again")
+        try:
+            storage = SQLiteStorage(database_file)
+            registry = HouseholdRegistry()
+            storage.load(registry)
+            for household in (Household("House", {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)}),
+                              Household("Flat", {"personA", "personC"}, {Chore("wash up", 3), Chore("empty bin", 2)})):
+                household.dirty = True
+                registry.add(household)
+            storage.save(registry)
+            registry.get("House").update_log("personB", "dusting", 3)
+            registry.get("Flat").update_log("personC", "empty bin", 2)
+            storage.close()
+            storage = SQLiteStorage(database_file)
+            registry = HouseholdRegistry()
+            storage.load(registry)
+            print("\n\tVALID: ", len(registry), registry.get("House").chore_log, registry.get("Flat").chore_log,
+                  storage.get_count("House", "personB", "dusting"))
+            storage.close()
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 2: Read the households lazily, keeping at most one")
+        try:
+            storage = SQLiteStorage(database_file)
+            registry = LazyHouseholdRegistry(capacity=1)
+            storage.load(registry)
+            registry.get("Flat").update_log("personA", "wash up", 2)
+            print("\n\tVALID: ", len(registry), registry.get("House").chore_log["personB"],
+                  registry.get("Flat").chore_log["personA"], registry.get("House").history.total("personB", "dusting"),
+                  registry.stats()[:4])
+            storage.close()
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 3: Read a household which is no longer valid")
+        try:
+            storage = SQLiteStorage(database_file)
+            with storage._connection:
+                storage._connection.execute("UPDATE households SET name = 'Flat1' WHERE name = 'Flat'")
+            registry = HouseholdRegistry()
+            storage.load(registry)
+            print("\n\tVALID: ", len(registry), storage.get_household("Flat1"))
+            storage.close()
+        except Exception as err:
+            print("\tERROR: ", err)
+
+
+if __name__ == "__main__":
+    main()
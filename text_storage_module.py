@@ -0,0 +1,979 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from household_module import Household
+from chores_list_module import ChoresList, Chore
+from participants_list_module import Participants
+from household_registry_module import HouseholdRegistry, LazyHouseholdRegistry
+from chore_journal_module import ChoreJournal
+from limits_module import apply_limits, current_limits
+
+# A line read from one of the data files
+# line_number : the number of the line in the file, starting at 1
+# fields : a list of the elements of the line split by comma
+# offset : the position in bytes of the start of the line in the file
+# length : the length in bytes of the line, not including the new line
+
+FileRecord = namedtuple("FileRecord", ["line_number", "fields", "offset", "length"])
+
+# The result of checking a line of the households file
+# household_name : the household name if it is valid, otherwise None
+# participants : a list of the participants if the whole line is valid, otherwise None
+# chores : a list of the chores and frequencies if the whole line is valid, otherwise None
+# error : a message saying why the line is not valid, or None if it is valid
+# layout_error : True if the line is not in the right format, rather than having invalid values
+
+HouseholdCheck = namedtuple("HouseholdCheck", ["household_name", "participants", "chores", "error", "layout_error"])
+
+# The number of chunks the households file is split into for each worker process when it
+# is read in parallel, so that a slow chunk does not leave the other workers waiting
+
+CHUNKS_PER_WORKER = 4
+
+# The file every logged chore is appended to
+
+CHORE_JOURNAL_FILE = "chore_journal.txt"
+
+# The first element of the chore log file's header line, which holds the sequence
+# number of the last journal update included in the file
+
+SNAPSHOT_HEADER = "#journal"
+
+# The first element of a line of the chore log file holding the number of times a participant
+# did each chore in one week, in the format:
+#
+# #week,household name,week number,participant,chore name,number completed,...
+
+WEEK_HEADER = "#week"
+
+
+# Reads a file line by line and yields each line as a record as it is read, so
+# that the whole file never has to be held in memory
+# @param file_name, the name of the file including file extension
+# @return a generator of FileRecord tuples holding the line number, the content
+#         of the line split by comma, and where the line is in the file
+#
+def read_records(file_name):
+    try:
+        # Open the file and read it line by line
+        # The file is read as bytes so that the position of each line is known
+        with open(file_name, "rb") as file:
+            offset = 0
+            for line_number, line in enumerate(file, 1):
+                length = len(line.rstrip(b"\r\n"))
+                # Removes the whitespace at the end of, and splits by comma, each line
+                yield FileRecord(line_number, line.decode().rstrip().split(","), offset, length)
+                offset = offset + len(line)
+    except IOError:
+        # Print an error if the file can not be found
+        print("Error: '{}' file can not be found.".format(file_name))
+
+
+# Writes a list to a file line by line
+# The list is written to a temporary file which then replaces the file, so the file
+# is never left half written if the program stops part way through
+# @param file_name, the name of the file including file extension
+# @param lines, a list containing the content to be written to the file, line by line
+#
+def write_to_file(file_name, lines):
+    # Creates a list to write to the file
+    output = []
+    # For each line in the lines list, join the elements into a string separated by a comma
+    # Then add the string the output list
+    for line in lines:
+        line = ",".join(line)
+        output.append(line)
+    # Joins all the elements in the output list separated by a new line
+    # This writes all the elements on different lines of the file
+    output = "\n".join(output)
+    # Opens a temporary file, writes the list to it, and then closes it
+    temporary_file_name = file_name + ".tmp"
+    with open(temporary_file_name, "w") as file:
+        file.write(output)
+        file.flush()
+        os.fsync(file.fileno())
+    # Replaces the file with the temporary file, creating the file if it does not exist
+    os.replace(temporary_file_name, file_name)
+
+
+# Reads the households file and sorts the data from it
+# @param all_households, a HouseholdRegistry of household objects
+# @param file_name, the name of the households file including file extension
+# @param record_index, a dictionary which, if given, has the offset and length of each
+#        valid household's line added to it, keyed by household name
+#
+def read_households(all_households, file_name="households.txt", record_index=None):
+    # Keeps the names already read in a set so that duplicates can be found without a scan
+    used_household_names = set()
+    # For each line of the households file, it validates the elements based on the given format
+    # The lines are read one at a time and each valid household is added as soon as it is read
+    for line_number, line, offset, length in read_records(file_name):
+        # Blank lines are left where a household's line has been moved to the end of the file
+        if line == [""]:
+            continue
+        check = check_household_line(line)
+        if add_checked_household(all_households, line_number, check, used_household_names) \
+                and record_index is not None:
+            record_index[check.household_name] = (offset, length)
+    return
+
+
+# Validates the elements of a line of the households file based on the given format.
+# Checking whether the household name has already been used is left to add_checked_household,
+# so that lines can be checked without knowing about the other lines.
+# @param line, a list of the elements of the line
+# @return a HouseholdCheck
+#
+def check_household_line(line):
+    # Tries to get the household name and if it can not be found, gives an error and skips the whole line
+    try:
+        household_name = line[0]
+    except (IndexError, ValueError):
+        return HouseholdCheck(None, None, None, "\tThe first element should be the households name.", True)
+    # Tries to get the participants and if it can not be found, gives an error and skips the whole line
+    try:
+        number_of_participants = int(line[1])
+        participants_offset = number_of_participants + 2
+        participants = line[2:participants_offset]
+    except (IndexError, ValueError):
+        return HouseholdCheck(None, None, None,
+                              "\tThe second element should be the number of participants followed by that "
+                              "number of participants.", True)
+    # Tries to get the chores and if it can not be found, gives an error and skips the whole line
+    try:
+        number_of_chores = int(line[participants_offset])
+        chores_offest = participants_offset + 1
+        chores = line[chores_offest:chores_offest + (2 * number_of_chores)]
+    except (IndexError, ValueError):
+        return HouseholdCheck(None, None, None,
+                              "\tThe element after the defined number of participants should be the number of "
+                              "chores followed by that number of chores and frequencies.", True)
+    # Checks if the households’ name is valid
+    # If not valid, gives an error and skips the whole line
+    try:
+        Household.is_valid_name(household_name)
+    except (TypeError, ValueError) as err:
+        return HouseholdCheck(None, None, None, str(err), False)
+    # Checks if the participants names' and number of participants are valid
+    # If not valid, gives an error and skips the whole line
+    try:
+        Participants.is_valid_length(participants)
+        for name in participants:
+            Participants.is_valid_name(name)
+        particpants_set = set(participants)
+        if len(participants) != len(particpants_set):
+            raise ValueError(
+                "There are multiple participants with the same.")
+    except (TypeError, ValueError) as err:
+        return HouseholdCheck(household_name, None, None, str(err), False)
+    # Checks if the number of chores, chore name, and chore frequency are is valid
+    # If not valid, gives an error and skips the whole line
+    # The chores are checked the same way as the Chore and ChoresList constructors check them,
+    # so that the household can be created without checking them again
+    try:
+        if len(chores) != 2 * number_of_chores:
+            raise ValueError("There should be a name and frequency for each of the {} chores."
+                             .format(number_of_chores))
+        chore_names = chores[0::2]
+        for chore, frequency in zip(chore_names, chores[1::2]):
+            Chore.is_valid_chore_name(chore)
+            Chore.is_valid_frequency(frequency)
+        ChoresList.is_valid_length(chore_names)
+        chore_names_set = set(chore_names)
+        if len(chore_names) != len(chore_names_set):
+            raise ValueError("There are multiple chores with the same.")
+    except (TypeError, ValueError) as err:
+        return HouseholdCheck(household_name, None, None, str(err), False)
+    return HouseholdCheck(household_name, participants, chores, None, False)
+
+
+# Adds a checked line of the households file to the households, or prints the error if it is not valid
+# @param all_households, a HouseholdRegistry of household objects
+# @param line_number, the number of the line in the file
+# @param check, the HouseholdCheck of the line
+# @param used_household_names, a set of the household names already read from the file
+# @return True if the household was added, False if not
+#
+def add_checked_household(all_households, line_number, check, used_household_names):
+    # Creates an error message referencing the line to be displayed when there is an error
+    error_msg = "\nError on line {} of the 'households' file (This line will be omitted):\n\t".format(
+        line_number)
+    if check.layout_error:
+        print(error_msg)
+        print(check.error)
+        return False
+    if check.household_name is not None and (check.household_name in used_household_names or
+                                             all_households.exists(check.household_name)):
+        print(error_msg, "The household name '{}' had already been used and can not be used again."
+              .format(check.household_name))
+        return False
+    if check.error is not None:
+        print(error_msg, check.error)
+        return False
+    used_household_names.add(check.household_name)
+    # Creates the objects for the valid household
+    add_household(all_households, check.household_name, check.participants, check.chores)
+    return True
+
+
+# Splits a file into byte ranges which each start at the beginning of a line and end
+# just after a new line, or at the end of the file.
+# @param file_name, the name of the file including file extension
+# @param number_of_chunks, the number of ranges to split the file into
+# @return a list of (start, end) byte offsets
+#
+def chunk_boundaries(file_name, number_of_chunks):
+    size = os.path.getsize(file_name)
+    boundaries = [0]
+    with open(file_name, "rb") as file:
+        for chunk in range(1, number_of_chunks):
+            position = max(size * chunk // number_of_chunks, boundaries[-1])
+            if position >= size:
+                break
+            # Moves the boundary forward to the start of the next line
+            file.seek(position)
+            file.readline()
+            position = file.tell()
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    boundaries.append(size)
+    return [(boundaries[i], boundaries[i + 1]) for i in range(len(boundaries) - 1)
+            if boundaries[i] < boundaries[i + 1]]
+
+
+# Checks every line in a byte range of the households file. Runs in a worker process.
+# @param file_name, the name of the households file including file extension
+# @param start, the offset of the first line of the range
+# @param end, the offset just after the last line of the range
+# @return a tuple of the number of lines in the range and a list of
+#         (line index in the range, offset, length, HouseholdCheck) for each line which is not blank
+#
+def check_households_chunk(file_name, start, end):
+    checks = []
+    number_of_lines = 0
+    with open(file_name, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    lines = data.split(b"\n")
+    # There is nothing after the new line at the end of the range
+    if lines[-1] == b"":
+        lines.pop()
+    offset = start
+    for line in lines:
+        fields = line.decode().rstrip().split(",")
+        # Blank lines are left where a household's line has been moved to the end of the file
+        if fields != [""]:
+            checks.append((number_of_lines, offset, len(line.rstrip(b"\r")), check_household_line(fields)))
+        number_of_lines = number_of_lines + 1
+        offset = offset + len(line) + 1
+    return number_of_lines, checks
+
+
+# Reads the households file using several processes to parse and validate the lines,
+# then adds the valid households in line order. Duplicate household names are found
+# and errors are printed in line order, the same as read_households.
+# @param all_households, a HouseholdRegistry of household objects
+# @param file_name, the name of the households file including file extension
+# @param workers, the number of worker processes, defaults to the number of processors
+# @param record_index, a dictionary which, if given, has the offset and length of each
+#        valid household's line added to it, keyed by household name
+#
+def read_households_parallel(all_households, file_name="households.txt", workers=None, record_index=None):
+    if not os.path.exists(file_name):
+        # Print an error if the file can not be found
+        print("Error: '{}' file can not be found.".format(file_name))
+        return
+    workers = workers or os.cpu_count() or 1
+    chunks = chunk_boundaries(file_name, workers * CHUNKS_PER_WORKER)
+    used_household_names = set()
+    # The workers check the lines against the same limits as this process
+    with ProcessPoolExecutor(workers, initializer=apply_limits, initargs=(current_limits(),)) as executor:
+        futures = [executor.submit(check_households_chunk, file_name, start, end) for start, end in chunks]
+        # The results are used in the order of the chunks, so the first line of each chunk
+        # follows on from the lines of the chunks before it
+        first_line_number = 1
+        for future in futures:
+            number_of_lines, checks = future.result()
+            for line_index, offset, length, check in checks:
+                if add_checked_household(all_households, first_line_number + line_index, check,
+                                         used_household_names) and record_index is not None:
+                    record_index[check.household_name] = (offset, length)
+            first_line_number = first_line_number + number_of_lines
+    return
+
+
+# Creates the objects for a valid household from the file
+# The line has already been checked by check_household_line, so the objects are
+# created without checking the values again
+#   @param all_households, a HouseholdRegistry of household objects
+#   @param household_name, a valid household name from file
+#   @param participants, a list of the valid participants from file
+#   @param chores, a list of the valid chores and frequencies from file
+#
+def add_household(all_households, household_name, participants, chores):
+    # The participants and chores are kept in the order they are in the file
+    chores_list = []
+    for i in range(0, len(chores), 2):
+        chore_obj = Chore.from_validated(chores[i], chores[i + 1])
+        chores_list.append(chore_obj)
+    household_obj = Household.from_validated(household_name, participants, chores_list)
+    all_households.add(household_obj)
+    return
+
+
+# Formats a household object as a line of the households file
+# @param household, a household object
+# @return a list of the elements of the line
+#
+def household_line(household):
+    line = []
+    # Gets all the attributes for the household
+    household_name = getattr(household, "household_name")
+    participants = getattr(household, "participants").participants
+    chores = getattr(household, "chores").chores
+    # Adds the household name, number of people and participants to the formatted line
+    line.append(household_name)
+    line.append(str(len(participants)))
+    line.extend(participants)
+    # Adds the number of chores and each chore name and frequency to the formatted line
+    line.append(str(len(chores)))
+    for chore in chores:
+        line.append(chore.chore_name)
+        line.append(str(chore.frequency))
+    return line
+
+
+# Formats the household objects for writing to a file
+# @param all_households, a HouseholdRegistry of household objects
+# @param file_name, the name of the households file including file extension
+#
+def write_households(all_households, file_name="households.txt"):
+    # Creates a list of all the lines to write to the file
+    all_lines = []
+    # For all the household objects, format the data to write to the file
+    for household in all_households:
+        all_lines.append(household_line(household))
+    # Write the all_lines list to the households file
+    write_to_file(file_name, all_lines)
+    return
+
+
+# Writes only the changed households to the households file, using the position of
+# each household's line so that the rest of the file is left as it is
+# A line which still fits in its old place is written over it, padded with spaces.
+# Otherwise the old line is blanked out with spaces and the line is added to the end of the file.
+# @param households, a list of the changed household objects
+# @param file_name, the name of the households file including file extension
+# @param record_index, a dictionary of the offset and length of each household's line, keyed by
+#        household name, which is updated with any lines that are moved or added
+#
+def update_households(households, file_name, record_index):
+    # Creates the file if it does not exist
+    with open(file_name, "ab"):
+        pass
+    with open(file_name, "r+b") as file:
+        end = file.seek(0, os.SEEK_END)
+        for household in households:
+            line = ",".join(household_line(household)).encode()
+            household_name = household.household_name
+            if household_name in record_index:
+                offset, length = record_index[household_name]
+                file.seek(offset)
+                if len(line) <= length:
+                    file.write(line.ljust(length))
+                    continue
+                file.write(b" " * length)
+            # Starts a new line if the file does not end with one
+            if end > 0:
+                file.seek(end - 1)
+                if file.read(1) != b"\n":
+                    file.write(b"\n")
+                    end = end + 1
+            file.seek(end)
+            file.write(line + b"\n")
+            record_index[household_name] = (end, len(line))
+            end = end + len(line) + 1
+        file.flush()
+        os.fsync(file.fileno())
+    return
+
+
+# Reads the chore_log from a file and updates the chore log from it
+# @param all_households, a HouseholdRegistry of household objects
+# @param file_name, the name of the chore log file including file extension
+# @return the sequence number of the last journal update included in the file, 0 if none are
+#
+def read_chore_log(all_households, file_name="chore_log.txt"):
+    sequence = 0
+    # For all the lines from the chore_log file, validate the data and update the chore log
+    for line_number, line, offset, length in read_records(file_name):
+        # Creates an error message referencing the line to be displayed when there is an error
+        error_msg = "\nError on line {} of the 'chore_log' file (This line will be omitted):\n\t".format(
+            line_number)
+        try:
+            # The snapshot header line holds the sequence number of the last journal update
+            if line[0] == SNAPSHOT_HEADER:
+                if line[1].isdigit() is False:
+                    raise ValueError("The journal sequence number should be a digit")
+                sequence = int(line[1])
+                continue
+            # If the household named by the line is a valid household, continue
+            # If not print an error message
+            household_obj = all_households.get(chore_log_household_name(line))
+            if household_obj is not None:
+                read_chore_log_line(household_obj, line)
+            else:
+                raise ValueError(
+                    "The first element should be the name of a current household.")
+        except ValueError as err:
+            print(error_msg, err)
+        except IndexError:
+            print(error_msg, "The 'chore_log' file is incomplete")
+    return sequence
+
+
+# Returns the name of the household a line of the chore_log file is for
+# @param line, a list of the elements of the line
+# @return the household name
+# @exception IndexError raised if the line is incomplete
+#
+def chore_log_household_name(line):
+    if line[0] == WEEK_HEADER:
+        return line[1]
+    return line[0]
+
+
+# Validates a line of the chore_log file for a household and updates the household's chore log from it
+# @param household_obj, the household named by the line
+# @param line, a list of the elements of the line
+# @exception ValueError raised if the line is not valid
+# @exception IndexError raised if the line is incomplete
+#
+def read_chore_log_line(household_obj, line):
+    if line[0] == WEEK_HEADER:
+        read_chore_log_week_line(household_obj, line)
+        return
+    # Gets the chore log for the respective household, which is keyed by participant and chore name
+    log = getattr(household_obj, "chore_log")
+    # If the second element is not a current participant, print an error and skip the line
+    if line[1] not in log:
+        raise ValueError(
+            "The second element should be the name of a current participant.")
+    # For every pair of elements after the second element, check that the two elements are valid
+    for i in range(2, len(line), 2):
+        # If the first of the pair is not a current chore, print an error and skip the line
+        if line[i] not in log[line[1]]:
+            raise ValueError("The chores should be current chores.")
+        # If the second of the pair is not a digit, print an error and skip the line
+        elif line[i + 1].isdigit() is False:
+            raise ValueError("The number completed should be a digit")
+        # The all time totals are not limited, as the maximum is for each week
+        # If all checks are passed, update the household
+        # The totals are not counted in any week, as the weeks are on their own lines
+        else:
+            household_obj.add_total(line[1], line[i], line[i + 1])
+
+
+# Validates a week line of the chore_log file for a household and updates the household's history from it
+# @param household_obj, the household named by the second element of the line
+# @param line, a list of the elements of the line
+# @exception ValueError raised if the line is not valid
+# @exception IndexError raised if the line is incomplete
+#
+def read_chore_log_week_line(household_obj, line):
+    if line[2].isdigit() is False:
+        raise ValueError("The week number should be a digit")
+    week = int(line[2])
+    log = getattr(household_obj, "chore_log")
+    if line[3] not in log:
+        raise ValueError(
+            "The fourth element should be the name of a current participant.")
+    # Every pair is checked before any are added, so a line is either all read or all omitted
+    counts = []
+    for i in range(4, len(line), 2):
+        if line[i] not in log[line[3]]:
+            raise ValueError("The chores should be current chores.")
+        elif line[i + 1].isdigit() is False:
+            raise ValueError("The number completed should be a digit")
+        elif int(line[i + 1]) > Household.MAXIMUM_CHORES_DONE:
+            raise ValueError("The number completed in a week must be under {}".format(Household.MAXIMUM_CHORES_DONE))
+        counts.append((line[i], int(line[i + 1])))
+    for chore, number_completed in counts:
+        household_obj.history.add(line[3], chore, number_completed, week)
+
+
+# Replays the chore journal on top of the chore log read from the chore_log file
+# @param all_households, a HouseholdRegistry of household objects
+# @param journal, the ChoreJournal holding the updates made since the chore_log file was written
+# @param snapshot_sequence, the sequence number of the last update included in the chore_log file
+#
+def replay_chore_journal(all_households, journal, snapshot_sequence=0):
+    journal.sequence = snapshot_sequence
+    journal.events = 0
+    # There is nothing to replay if no chores have been logged since the chore_log file was written
+    if not os.path.exists(journal.file_name):
+        return
+    for line_number, line, offset, length in read_records(journal.file_name):
+        journal.events = journal.events + 1
+        # Creates an error message referencing the line to be displayed when there is an error
+        error_msg = "\nError on line {} of the 'chore_journal' file (This line will be omitted):\n\t".format(
+            line_number)
+        try:
+            sequence, household_name, name, chore, number_completed, timestamp = ChoreJournal.parse_event(line)
+            # Updates up to the snapshot's sequence number are already in the chore log
+            if sequence <= journal.sequence:
+                continue
+            journal.sequence = sequence
+            household_obj = all_households.get(household_name)
+            if household_obj is None:
+                raise ValueError("The first element should be the name of a current household.")
+            replay_journal_event(household_obj, name, chore, number_completed, timestamp)
+        except ValueError as err:
+            print(error_msg, err)
+        except IndexError:
+            print(error_msg, "The 'chore_journal' file is incomplete")
+    return
+
+
+# Validates an update from the chore journal and applies it to a household's chore log
+# @param household_obj, the household named by the update
+# @param name, the name of the participant
+# @param chore, the name of the chore
+# @param number_completed, the number added on to the existing total
+# @param timestamp, the time of the update in seconds since the epoch
+# @exception ValueError raised if the update is not valid
+#
+def replay_journal_event(household_obj, name, chore, number_completed, timestamp):
+    log = getattr(household_obj, "chore_log")
+    if name not in log:
+        raise ValueError("The second element should be the name of a current participant.")
+    if chore not in log[name]:
+        raise ValueError("The chores should be current chores.")
+    if household_obj.week_count(name, chore, timestamp) + number_completed > Household.MAXIMUM_CHORES_DONE:
+        raise ValueError("The number completed in a week must be under {}".format(Household.MAXIMUM_CHORES_DONE))
+    household_obj.update_log(name, chore, number_completed, timestamp)
+
+
+# Formats the chore_log attribute for writing to a file
+# @param all_households, a HouseholdRegistry of household objects
+# @param sequence, the sequence number of the last journal update included in the chore logs
+# @param file_name, the name of the chore log file including file extension
+#
+def write_chore_log(all_households, sequence=0, file_name="chore_log.txt"):
+    # Creates a list of the lines to be written to a file, starting with the snapshot header
+    lines = [[SNAPSHOT_HEADER, str(sequence)]]
+    # For every household, format the data to be written to the file
+    for household in all_households:
+        lines.extend(chore_log_lines(household))
+    # Write all the chore log data to the file
+    write_to_file(file_name, lines)
+    return
+
+
+# Formats a household's chore log for writing to the chore_log file
+# @param household, a Household object
+# @return a list of the lines for the household, each a list of its elements
+#
+def chore_log_lines(household):
+    lines = []
+    # Gets the chore_log for the respective household
+    household_name = getattr(household, "household_name")
+    log = getattr(household, "chore_log")
+    # Creates a sting from the chore_log in the format household name, participant, chore_name, number completed
+    for name in log:
+        file_line = []
+        file_line.append(household_name)
+        file_line.append(name)
+        for chore in log[name]:
+            file_line.append(chore)
+            file_line.append(str(log[name][chore]))
+        lines.append(file_line)
+    # Adds a line for each week and participant with the number of times they did each chore that week
+    week_lines = {}
+    for week, name, chore, count in household.history.records():
+        week_lines.setdefault((week, name), [WEEK_HEADER, household_name, str(week), name]).extend(
+            [chore, str(count)])
+    lines.extend(week_lines.values())
+    return lines
+
+
+# Finds where each household's lines are in the households file without checking them,
+# so that a household can be read on its own when it is needed
+# @param file_name, the name of the households file including file extension
+# @return a dictionary of a list of (line number, offset, length) for each line, keyed by household name
+#
+def index_households_file(file_name="households.txt"):
+    household_lines = {}
+    try:
+        with open(file_name, "rb") as file:
+            offset = 0
+            for line_number, line in enumerate(file, 1):
+                household_name = line.split(b",", 1)[0].decode().rstrip()
+                # Blank lines are left where a household's line has been moved to the end of the file
+                if household_name:
+                    household_lines.setdefault(household_name, []).append(
+                        (line_number, offset, len(line.rstrip(b"\r\n"))))
+                offset = offset + len(line)
+    except IOError:
+        # Print an error if the file can not be found
+        print("Error: '{}' file can not be found.".format(file_name))
+    return household_lines
+
+
+# Finds where each household's lines are in the chore_log file without checking them
+# @param file_name, the name of the chore log file including file extension
+# @return a tuple of the sequence number of the last journal update included in the file,
+#         and a dictionary of a list of (line number, offset, length) for each line, keyed by household name
+#
+def index_chore_log_file(file_name="chore_log.txt"):
+    sequence = 0
+    chore_log_index = {}
+    for line_number, line, offset, length in read_records(file_name):
+        if line[0] == SNAPSHOT_HEADER:
+            if len(line) > 1 and line[1].isdigit():
+                sequence = int(line[1])
+            else:
+                print("\nError on line {} of the 'chore_log' file (This line will be omitted):\n\t"
+                      .format(line_number), "The journal sequence number should be a digit")
+        else:
+            chore_log_index.setdefault(chore_log_household_name(line), []).append((line_number, offset, length))
+    return sequence, chore_log_index
+
+
+# Reads the chore journal's updates made since the chore_log file was written, grouped
+# by household, so that they can be replayed on each household when it is read
+# @param journal, the ChoreJournal holding the updates made since the chore_log file was written
+# @param snapshot_sequence, the sequence number of the last update included in the chore_log file
+# @return a dictionary of a list of (line number, participant, chore, number completed, timestamp)
+#         for each update, keyed by household name
+#
+def index_chore_journal(journal, snapshot_sequence=0):
+    journal.sequence = snapshot_sequence
+    journal.events = 0
+    events = {}
+    if not os.path.exists(journal.file_name):
+        return events
+    for line_number, line, offset, length in read_records(journal.file_name):
+        journal.events = journal.events + 1
+        try:
+            sequence, household_name, name, chore, number_completed, timestamp = ChoreJournal.parse_event(line)
+            # Updates up to the snapshot's sequence number are already in the chore log
+            if sequence <= journal.sequence:
+                continue
+            journal.sequence = sequence
+            events.setdefault(household_name, []).append((line_number, name, chore, number_completed, timestamp))
+        except ValueError as err:
+            print("\nError on line {} of the 'chore_journal' file (This line will be omitted):\n\t"
+                  .format(line_number), err)
+        except IndexError:
+            print("\nError on line {} of the 'chore_journal' file (This line will be omitted):\n\t"
+                  .format(line_number), "The 'chore_journal' file is incomplete")
+    return events
+
+
+# Reads a single line of a file
+# @param file_name, the name of the file including file extension
+# @param offset, the position in bytes of the start of the line
+# @param length, the length in bytes of the line
+# @return a list of the elements of the line split by comma
+#
+def read_line_at(file_name, offset, length):
+    with open(file_name, "rb") as file:
+        file.seek(offset)
+        return file.read(length).decode().rstrip().split(",")
+
+
+class TextFileStorage:
+
+    # Constructor for the TextFileStorage class. Stores the households and chore logs in
+    # comma separated text files. The chore log file is a snapshot, and the chores logged
+    # since it was written are appended to a ChoreJournal.
+    #
+    # @param households_file the name of the households file including file extension
+    # @param chore_log_file the name of the chore log file including file extension
+    # @param journal_file the name of the chore journal file including file extension
+    # @param workers the number of processes used to read the households file, or None to read
+    #        it in this process
+    #
+    def __init__(self, households_file="households.txt", chore_log_file="chore_log.txt",
+                 journal_file=CHORE_JOURNAL_FILE, workers=None):
+        self.households_file = households_file
+        self.workers = workers
+        self.chore_log_file = chore_log_file
+        self.journal = ChoreJournal(journal_file, self.write_snapshot)
+        self._all_households = None
+        # The offset and length of each household's line in the households file
+        self._record_index = None
+        # When the households are read lazily, where each household's lines are in the households
+        # and chore log files, and the journal's updates for each household, all keyed by household name
+        self._household_lines = None
+        self._chore_log_index = None
+        self._journal_events = None
+
+    # Read every household and its chore log into a registry, and record every chore
+    # logged from then on in the journal.
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    #
+    def load(self, all_households):
+        self._all_households = all_households
+        if isinstance(all_households, LazyHouseholdRegistry):
+            self.load_lazily(all_households)
+            return
+        self._record_index = {}
+        if self.workers:
+            read_households_parallel(all_households, self.households_file, self.workers, self._record_index)
+        else:
+            read_households(all_households, self.households_file, self._record_index)
+        snapshot_sequence = self.read_chore_log(all_households)
+        replay_chore_journal(all_households, self.journal, snapshot_sequence)
+        # Once the journal is long enough it is compacted into a new chore log file
+        if self.journal.needs_compaction():
+            self.journal.compact()
+        all_households.add_listener(self.journal)
+        all_households.mark_clean()
+
+    # Find where every household is in the files, without reading the households, and
+    # give the registry load_household to read each household when it is first needed.
+    # The journal's updates are kept in memory, grouped by household, along with every
+    # chore logged from then on, so that a household let go by the registry can be read again.
+    #
+    # @param all_households a LazyHouseholdRegistry
+    #
+    def load_lazily(self, all_households):
+        self._household_lines = index_households_file(self.households_file)
+        self._record_index = {}
+        snapshot_sequence, self._chore_log_index = index_chore_log_file(self.chore_log_file)
+        self._journal_events = index_chore_journal(self.journal, snapshot_sequence)
+        all_households.index_households(self._household_lines, self.load_household, self.write_back)
+        if self.journal.needs_compaction():
+            self.journal.compact()
+        # The storage keeps the update before the journal is told, in case the journal is compacted
+        all_households.add_listener(self)
+        all_households.add_listener(self.journal)
+        all_households.mark_clean()
+
+    # Read a household, its lines of the chore log file and its updates from the journal.
+    # Errors are printed the same as when every household is read at once.
+    #
+    # @param household_name the name of the household
+    # @return the Household object, or None if it is not valid or is not in the households file
+    #
+    def load_household(self, household_name):
+        # The first valid line for the household is read, the same as when every household is read
+        household = HouseholdRegistry()
+        used_household_names = set()
+        for line_number, offset, length in self._household_lines.get(household_name, ()):
+            check = check_household_line(read_line_at(self.households_file, offset, length))
+            if add_checked_household(household, line_number, check, used_household_names):
+                self._record_index[household_name] = (offset, length)
+        if not household.exists(household_name):
+            return None
+        household_obj = household.get(household_name)
+        household_obj.listeners = ()
+        for line_number, offset, length in self._chore_log_index.get(household_name, ()):
+            try:
+                read_chore_log_line(household_obj, read_line_at(self.chore_log_file, offset, length))
+            except ValueError as err:
+                print("\nError on line {} of the 'chore_log' file (This line will be omitted):\n\t"
+                      .format(line_number), err)
+            except IndexError:
+                print("\nError on line {} of the 'chore_log' file (This line will be omitted):\n\t"
+                      .format(line_number), "The 'chore_log' file is incomplete")
+        for line_number, name, chore, number_completed, timestamp in self._journal_events.get(household_name, ()):
+            try:
+                replay_journal_event(household_obj, name, chore, number_completed, timestamp)
+            except ValueError as err:
+                print("\nError on line {} of the 'chore_journal' file (This line will be omitted):\n\t"
+                      .format(line_number), err)
+        household_obj.dirty = False
+        return household_obj
+
+    # Called by a household whenever its chore log is updated. When the households are read
+    # lazily, keeps the update so that it is replayed if the household is read again.
+    #
+    # @param household the Household object that was updated
+    # @param name a string containing the name of the participant
+    # @param chore a string containing the name of the chore
+    # @param number_completed the number added on to the existing total
+    # @param timestamp the time the chores were done in seconds since the epoch
+    #
+    def chore_logged(self, household, name, chore, number_completed, timestamp):
+        if self._journal_events is not None:
+            self._journal_events.setdefault(household.household_name, []).append(
+                (None, name, chore, number_completed, timestamp))
+
+    # Write the households which have changed since they were loaded or last saved.
+    # Only the changed households' lines are written. The chore logs have already been
+    # written to the journal as the chores were logged.
+    #
+    # @param all_households a HouseholdRegistry of household objects
+    #
+    def save(self, all_households):
+        if self._record_index is None:
+            self.write_households(all_households)
+        else:
+            self.write_back(all_households.dirty_households())
+        all_households.mark_clean()
+
+    # Write changed households to the households file, leaving the rest of the file as it is.
+    # The chore logs have already been written to the journal as the chores were logged.
+    #
+    # @param households a list of the changed Household objects
+    #
+    def write_back(self, households):
+        update_households(households, self.households_file, self._record_index)
+        # A household read again is read from where its line is now
+        if self._household_lines is not None:
+            for household in households:
+                offset, length = self._record_index[household.household_name]
+                self._household_lines[household.household_name] = [(None, offset, length)]
+
+    # Close the journal file.
+    #
+    def close(self):
+        self.journal.close()
+
+    # Return the household with the given name, including its chore log. There is no
+    # index of the text files, so the files are read until the household is found.
+    #
+    # @param household_name the name of the household
+    # @return the Household object, or None if it does not exist.
+    #
+    def get_household(self, household_name):
+        if self._all_households is not None:
+            return self._all_households.get(household_name)
+        all_households = HouseholdRegistry()
+        self.read_households(all_households)
+        household = all_households.get(household_name)
+        if household is not None:
+            snapshot_sequence = self.read_chore_log(all_households)
+            replay_chore_journal(all_households, ChoreJournal(self.journal.file_name), snapshot_sequence)
+        return household
+
+    def read_households(self, all_households):
+        read_households(all_households, self.households_file)
+
+    def write_households(self, all_households):
+        write_households(all_households, self.households_file)
+        # The lines of the households file have moved
+        if self._journal_events is None:
+            self._record_index = None
+        else:
+            self._household_lines = index_households_file(self.households_file)
+            self._record_index = {household_name: lines[0][1:]
+                                  for household_name, lines in self._household_lines.items()}
+
+    def read_chore_log(self, all_households):
+        return read_chore_log(all_households, self.chore_log_file)
+
+    def write_chore_log(self, all_households):
+        write_chore_log(all_households, self.journal.sequence, self.chore_log_file)
+
+    # Write a snapshot of every chore log, used by the journal when it is compacted.
+    #
+    # @param sequence the sequence number of the last journal update included in the chore logs
+    #
+    def write_snapshot(self, sequence):
+        if self._journal_events is None:
+            write_chore_log(self._all_households, sequence, self.chore_log_file)
+            return
+        self.write_lazy_snapshot(sequence)
+        # The households read from now on are read from the new chore log file, which
+        # includes every update so far
+        self._chore_log_index = index_chore_log_file(self.chore_log_file)[1]
+        self._journal_events = {}
+
+    # Write a snapshot of every chore log when the households are read lazily, without reading
+    # every household. The households kept by the registry are written as they are, and the
+    # lines of a household which is not kept and has no updates in the journal are copied from
+    # the chore log file. Only the households with updates in the journal are read.
+    #
+    # @param sequence the sequence number of the last journal update included in the chore logs
+    #
+    def write_lazy_snapshot(self, sequence):
+        lines = [[SNAPSHOT_HEADER, str(sequence)]]
+        # The chore log file only has to be opened if it has lines to copy
+        chore_log_file = open(self.chore_log_file, "rb") if self._chore_log_index else None
+        try:
+            for household_name in self._all_households.household_names():
+                household = self._all_households.kept(household_name)
+                if household is None and self._journal_events.get(household_name):
+                    household = self.load_household(household_name)
+                if household is not None:
+                    lines.extend(chore_log_lines(household))
+                    continue
+                for line_number, offset, length in self._chore_log_index.get(household_name, ()):
+                    chore_log_file.seek(offset)
+                    lines.append(chore_log_file.read(length).decode().rstrip().split(","))
+        finally:
+            if chore_log_file is not None:
+                chore_log_file.close()
+        write_to_file(self.chore_log_file, lines)
+
+
+# main method
+#
+# Contains some simple tests
+#
+def main():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_names = [os.path.join(directory, file_name)
+                      for file_name in ("households.txt", "chore_log.txt", CHORE_JOURNAL_FILE)]
+
+        print("Test 1: Save two households, log some chores and load them again")
+        try:
+            registry = HouseholdRegistry()
+            registry.add(Household("House", {"personA", "personB"}, {Chore("wash up", 4), Chore("dusting", 1)}))
+            registry.add(Household("Flat", {"personA", "personC"}, {Chore("wash up", 3), Chore("empty bin", 2)}))
+            write_households(registry, file_names[0])
+            write_chore_log(registry, 0, file_names[1])
+            storage = TextFileStorage(*file_names)
+            registry = HouseholdRegistry()
+            storage.load(registry)
+            registry.get("House").update_log("personB", "dusting", 3)
+            registry.get("Flat").update_log("personC", "empty bin", 2)
+            storage.close()
+            registry = HouseholdRegistry()
+            TextFileStorage(*file_names).load(registry)
+            print("\n\tVALID: ", len(registry), registry.get("House").chore_log, registry.get("Flat").chore_log)
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 2: Compact the journal into the chore log file once it is long enough")
+        try:
+            threshold = ChoreJournal.COMPACTION_THRESHOLD
+            ChoreJournal.COMPACTION_THRESHOLD = 3
+            storage = TextFileStorage(*file_names)
+            registry = HouseholdRegistry()
+            storage.load(registry)
+            registry.get("House").update_log("personA", "wash up", 1)
+            storage.close()
+            ChoreJournal.COMPACTION_THRESHOLD = threshold
+            with open(file_names[2]) as file:
+                journal_lines = file.read().splitlines()
+            registry = HouseholdRegistry()
+            read_households(registry, file_names[0])
+            print("\n\tVALID: ", read_chore_log(registry, file_names[1]), journal_lines,
+                  registry.get("House").chore_log)
+        except Exception as err:
+            print("\tERROR: ", err)
+
+        print("\nTest 3: Read the households lazily, keeping at most one")
+        try:
+            storage = TextFileStorage(*file_names)
+            registry = LazyHouseholdRegistry(capacity=1)
+            storage.load(registry)
+            registry.get("Flat").update_log("personA", "wash up", 2)
+            print("\n\tVALID: ", len(registry), registry.get("House").chore_log["personB"],
+                  registry.get("Flat").chore_log["personA"], registry.stats()[:4])
+            storage.close()
+        except Exception as err:
+            print("\tERROR: ", err)
+
+
+if __name__ == "__main__":
+    main()